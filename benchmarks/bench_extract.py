@@ -0,0 +1,90 @@
+"""
+Benchmark LINEITEMID extraction on long impression journeys.
+
+Compares DataProcessor.extract_lineitem_ids with the fast extractor in
+src/impressions.py.
+
+Usage:
+    poetry run python benchmarks/bench_extract.py
+"""
+
+import contextlib
+import io
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_processor import DataProcessor  # noqa: E402
+from impressions import JSON_BACKEND, extract_lineitem_ids_fast  # noqa: E402
+
+JOURNEY_LENGTHS = [10, 100, 500, 1000]
+DISTINCT_LINEITEMS = [5, 50, 250]
+JOURNEYS_PER_CASE = 200
+
+
+def make_journey(length: int, distinct: int, rng: random.Random) -> str:
+    """Build an Impressions JSON string with `length` impressions."""
+    lineitem_ids = [str(10**15 + rng.randrange(10**12)) for _ in range(distinct)]
+    return json.dumps(
+        [
+            {
+                "LINEITEMID": rng.choice(lineitem_ids),
+                "CREATIVEID": str(rng.randrange(10**6)),
+                "TIMESTAMP": "2025-01-01T00:00:00Z",
+            }
+            for _ in range(length)
+        ]
+    )
+
+
+def main():
+    rng = random.Random(42)
+    # extract_lineitem_ids uses no processor state, so skip __init__ (which
+    # requires transaction data)
+    processor = DataProcessor.__new__(DataProcessor)
+
+    print(f"JSON backend: {JSON_BACKEND}")
+    print(
+        f"{'impressions':>12} {'distinct':>9} {'current (ms)':>13} "
+        f"{'fast (ms)':>10} {'speedup':>8}"
+    )
+
+    for length in JOURNEY_LENGTHS:
+        for distinct in DISTINCT_LINEITEMS:
+            journeys = [
+                make_journey(length, distinct, rng) for _ in range(JOURNEYS_PER_CASE)
+            ]
+
+            for journey in journeys:
+                assert processor.extract_lineitem_ids(
+                    journey
+                ) == extract_lineitem_ids_fast(journey)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                current = min(
+                    timeit.repeat(
+                        lambda: [processor.extract_lineitem_ids(j) for j in journeys],
+                        number=1,
+                        repeat=3,
+                    )
+                )
+            fast = min(
+                timeit.repeat(
+                    lambda: [extract_lineitem_ids_fast(j) for j in journeys],
+                    number=1,
+                    repeat=3,
+                )
+            )
+
+            print(
+                f"{length:>12} {distinct:>9} {current * 1000:>13.1f} "
+                f"{fast * 1000:>10.1f} {current / fast:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
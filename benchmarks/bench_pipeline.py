@@ -0,0 +1,246 @@
+"""
+Benchmark each stage of the Line Item Performance pipeline.
+
+Generates synthetic data (see synthetic_data.py), then times loading, a
+DataProcessor.process_transactions run and the Excel export. The processing
+is broken down into Impressions parsing, aggregation, NXN enrichment, ROAS
+and the unmatched-items anti-join with the processor's own stage profile
+(see DataProcessor.get_stage_stats). Results are printed as a table
+and written as JSON so runs can be compared across versions.
+
+Usage:
+    poetry run python benchmarks/bench_pipeline.py --transactions 10000 100000 \\
+        --output benchmarks/results/pipeline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from aggregates import TRANSACTION_COLUMNS  # noqa: E402
+from data_processor import (  # noqa: E402
+    PROCESSING_STAGES,
+    DataProcessor,
+    load_nxn_lookup_file,
+    load_transaction_file,
+)
+from impressions import JSON_BACKEND  # noqa: E402
+from report_export import report_sheets, report_workbook_bytes  # noqa: E402
+from synthetic_data import generate_dataset  # noqa: E402
+
+STAGES = ["load", *PROCESSING_STAGES, "export"]
+
+
+def named_buffer(data: bytes, name: str) -> io.BytesIO:
+    """Wrap file content like an upload (a file object with a name)."""
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    return buffer
+
+
+def serialize(df: pd.DataFrame, load_format: str) -> bytes:
+    """Write a frame in the input format being benchmarked."""
+    output = io.BytesIO()
+    if load_format == "csv":
+        df.to_csv(output, index=False)
+    elif load_format == "parquet":
+        df.to_parquet(output, index=False)
+    else:
+        df.to_excel(output, sheet_name="DATA", index=False)
+    return output.getvalue()
+
+
+def run_pipeline(
+    transaction_bytes: bytes, lookup_bytes: bytes, load_format: str, engine: str
+) -> dict:
+    """
+    Run every stage once.
+
+    Returns:
+        Dict of stage name to {"seconds", "rows_in", "rows_out"}; processing
+        stages that did not run (no line items found) take 0 seconds
+    """
+    timings = {}
+
+    def timed(stage, rows_in, func):
+        start = time.perf_counter()
+        result = func()
+        timings[stage] = {
+            "seconds": time.perf_counter() - start,
+            "rows_in": rows_in,
+            "rows_out": len(result) if result is not None else 0,
+        }
+        return result
+
+    def load():
+        data_df = load_transaction_file(
+            named_buffer(transaction_bytes, f"transactions.{load_format}"),
+            columns=TRANSACTION_COLUMNS,
+        )
+        nxn_lookup_df = load_nxn_lookup_file(named_buffer(lookup_bytes, "lookup.csv"))
+        return data_df, nxn_lookup_df
+
+    data_df, nxn_lookup_df = timed("load", None, load)
+    timings["load"]["rows_out"] = len(data_df)
+
+    # Processing stages come from the processor's own profile, so they
+    # measure exactly what process_transactions runs
+    processor = DataProcessor(data_df, nxn_lookup_df, engine=engine)
+    results_df = processor.process_transactions()
+    for stage in PROCESSING_STAGES:
+        timings[stage] = {"seconds": 0.0, "rows_in": None, "rows_out": 0}
+    for record in processor.get_stage_stats().itertuples(index=False):
+        timings[record.stage] = {
+            "seconds": record.seconds,
+            "rows_in": None if pd.isna(record.rows_in) else int(record.rows_in),
+            "rows_out": None if pd.isna(record.rows_out) else int(record.rows_out),
+        }
+
+    def export():
+        sheets = report_sheets(
+            processor.get_results_with_transaction_ids(),
+            processor.unmatched_nxn_df,
+            processor.get_revenue_by_source_file(),
+        )
+        report_workbook_bytes(sheets)
+        return sheets[next(iter(sheets))]
+
+    timed("export", len(results_df), export)
+    return timings
+
+
+def git_revision() -> str:
+    """Current git commit of the repository, or "unknown"."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--transactions",
+        type=int,
+        nargs="+",
+        default=[10_000],
+        help="Transaction counts to benchmark (one run per count)",
+    )
+    parser.add_argument("--impressions", type=float, default=20)
+    parser.add_argument("--cardinality", type=int, default=1_000)
+    parser.add_argument("--malformed-rate", type=float, default=0.01)
+    parser.add_argument("--nxn-duplicate-rate", type=float, default=0.05)
+    parser.add_argument(
+        "--load-format", choices=["csv", "xlsx", "parquet"], default="csv"
+    )
+    parser.add_argument("--engine", choices=["columnar", "rows"], default="columnar")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per size; the fastest is kept"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Path of the JSON results file")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    record = {
+        "benchmark": "pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "json_backend": JSON_BACKEND,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "parameters": {
+            "impressions_per_journey": args.impressions,
+            "lineitem_cardinality": args.cardinality,
+            "malformed_rate": args.malformed_rate,
+            "nxn_duplicate_rate": args.nxn_duplicate_rate,
+            "load_format": args.load_format,
+            "engine": args.engine,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "runs": [],
+    }
+
+    print(
+        f"{'transactions':>12} "
+        + " ".join(f"{stage:>10}" for stage in STAGES)
+        + f" {'total':>10}"
+    )
+
+    for transactions in args.transactions:
+        data_df, nxn_lookup_df = generate_dataset(
+            transactions=transactions,
+            impressions_per_journey=args.impressions,
+            lineitem_cardinality=args.cardinality,
+            malformed_rate=args.malformed_rate,
+            nxn_duplicate_rate=args.nxn_duplicate_rate,
+            seed=args.seed,
+        )
+        transaction_bytes = serialize(data_df, args.load_format)
+        lookup_bytes = serialize(nxn_lookup_df, "csv")
+
+        best = None
+        for _ in range(args.repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                timings = run_pipeline(
+                    transaction_bytes, lookup_bytes, args.load_format, args.engine
+                )
+            if best is None:
+                best = timings
+            else:
+                for stage, timing in timings.items():
+                    if timing["seconds"] < best[stage]["seconds"]:
+                        best[stage] = timing
+
+        total = sum(timing["seconds"] for timing in best.values())
+        record["runs"].append(
+            {
+                "transactions": transactions,
+                "stages": [{"stage": stage, **best[stage]} for stage in STAGES],
+                "total_seconds": total,
+            }
+        )
+        print(
+            f"{transactions:>12} "
+            + " ".join(f"{best[stage]['seconds']:>10.3f}" for stage in STAGES)
+            + f" {total:>10.3f}"
+        )
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(record, indent=2) + "\n")
+        print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Synthetic transaction and NXN lookup data for benchmarks.
+
+Generates frames shaped like the DATA tab of a Dashboard Transactions export
+and the NXN LINE ITEM ID DELIVERY LOOKUP tab, with configurable size,
+journey length, LINEITEMID cardinality, malformed Impressions rate and
+duplicate lookup rows.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+# Impressions values used for malformed rows, as seen in real exports
+MALFORMED_IMPRESSIONS = [
+    '[{"LINEITEMID": "1"',
+    "",
+    None,
+    "not json",
+    '{"LINEITEMID": "1"}',
+]
+
+
+def generate_dataset(
+    transactions: int = 10_000,
+    impressions_per_journey: float = 20,
+    lineitem_cardinality: int = 1_000,
+    malformed_rate: float = 0.01,
+    nxn_duplicate_rate: float = 0.05,
+    nxn_match_rate: float = 0.8,
+    source_files: int = 3,
+    seed: int = 0,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Generate a transaction frame and a matching NXN lookup frame.
+
+    Args:
+        transactions: Number of transaction rows
+        impressions_per_journey: Mean number of impressions per journey
+            (Poisson distributed)
+        lineitem_cardinality: Number of distinct LINEITEMIDs in journeys
+        malformed_rate: Fraction of rows with unparseable Impressions
+        nxn_duplicate_rate: Fraction of lookup line items with an extra row
+            (e.g. a second beacon name)
+        nxn_match_rate: Fraction of journey LINEITEMIDs present in the
+            lookup; the lookup also gets unmatched line items of its own
+        source_files: Number of distinct Source File Name values
+        seed: Random seed
+
+    Returns:
+        Tuple of (transaction DataFrame, NXN lookup DataFrame)
+    """
+    rng = np.random.default_rng(seed)
+
+    lineitem_ids = 10**15 + rng.choice(10**12, size=lineitem_cardinality, replace=False)
+    fragments = np.array(
+        [
+            json.dumps(
+                {
+                    "LINEITEMID": str(lid),
+                    "CREATIVEID": str(rng.integers(10**6)),
+                    "TIMESTAMP": "2025-01-01T00:00:00Z",
+                }
+            )
+            for lid in lineitem_ids
+        ],
+        dtype=object,
+    )
+
+    # Zipf-like popularity so a few line items appear in most journeys
+    weights = 1.0 / np.arange(1, lineitem_cardinality + 1)
+    weights /= weights.sum()
+
+    lengths = rng.poisson(impressions_per_journey, size=transactions)
+    codes = rng.choice(lineitem_cardinality, size=int(lengths.sum()), p=weights)
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    impressions = [
+        "[" + ", ".join(fragments[codes[start:end]]) + "]"
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+
+    malformed = np.flatnonzero(rng.random(transactions) < malformed_rate)
+    for position in malformed:
+        impressions[position] = MALFORMED_IMPRESSIONS[
+            position % len(MALFORMED_IMPRESSIONS)
+        ]
+
+    data_df = pd.DataFrame(
+        {
+            "Transaction ID": [f"T{i:09d}" for i in range(transactions)],
+            "Transaction Total": np.round(rng.uniform(1, 500, transactions), 2),
+            "Impressions": impressions,
+            "Source File Name": [
+                f"transactions_{i % source_files}.xlsx" for i in range(transactions)
+            ],
+        }
+    )
+
+    return data_df, generate_lookup(
+        lineitem_ids, nxn_duplicate_rate, nxn_match_rate, rng
+    )
+
+
+def generate_lookup(
+    lineitem_ids: np.ndarray,
+    duplicate_rate: float,
+    match_rate: float,
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    """
+    Generate an NXN lookup frame for the given journey LINEITEMIDs.
+
+    Args:
+        lineitem_ids: LINEITEMIDs appearing in journeys
+        duplicate_rate: Fraction of line items with an extra row
+        match_rate: Fraction of lineitem_ids included in the lookup
+        rng: Random generator
+
+    Returns:
+        Lookup DataFrame with the columns load_nxn_lookup_file returns
+    """
+    matched = rng.choice(
+        lineitem_ids, size=int(len(lineitem_ids) * match_rate), replace=False
+    )
+    unmatched = 2 * 10**15 + rng.choice(
+        10**12, size=max(len(lineitem_ids) // 10, 1), replace=False
+    )
+    ids = np.concatenate([matched, unmatched])
+    ids = np.concatenate([ids, ids[rng.random(len(ids)) < duplicate_rate]])
+
+    rows = len(ids)
+    insertion_orders = rng.integers(1, 50, rows)
+    packages = rng.integers(1, 200, rows)
+    return pd.DataFrame(
+        {
+            "advertiser_name": "Synthetic Advertiser",
+            "insertion_order_id": insertion_orders,
+            "insertion_order_name": [f"IO {i}" for i in insertion_orders],
+            "packag_id": packages,
+            "package_name": [f"Package {p}" for p in packages],
+            "line_item_id": pd.array(ids, dtype="Int64"),
+            "line_item_name": [f"Line Item {lid}" for lid in ids],
+            "impressions": rng.integers(0, 1_000_000, rows),
+            "advertiser_invoice": np.round(rng.uniform(0, 10_000, rows), 2),
+        }
+    )
@@ -0,0 +1,429 @@
+"""
+Mergeable per-LINEITEMID transaction aggregates.
+
+Partial aggregates can be built independently for separate slices of the
+transaction data (e.g. in worker processes) and merged into the same result
+the serial DataProcessor path produces.
+"""
+
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from attribution import (
+    ATTRIBUTED_REVENUE_COLUMNS,
+    LAST_IMPRESSION_COLUMN,
+    TOUCH_POSITION_COLUMN,
+    attributed_revenue,
+)
+from impressions import (
+    FIRST_IMPRESSION_COLUMN,
+    POSITION_COLUMN,
+    ROW_COLUMN,
+    extract_lineitem_touches,
+)
+from transaction_dedup import TransactionDeduplicator
+from transaction_index import TransactionIndex, unique_sorted
+
+# Transaction columns needed to build transaction-lineitem pairs
+TRANSACTION_COLUMNS = ["Transaction ID", "Transaction Total", "Impressions"]
+
+# Membership chunks are deduplicated once this many have accumulated
+MAX_MEMBERSHIP_CHUNKS = 16
+
+
+def explode_transactions(
+    data_df: pd.DataFrame, impressions_df: Optional[pd.DataFrame] = None
+) -> tuple[pd.DataFrame, int]:
+    """
+    Expand transactions into transaction-lineitem pairs in bulk.
+
+    The Impressions column is parsed in a single pass and the transaction
+    columns are repeated with array indexing instead of building a dict per
+    pair.
+
+    Args:
+        data_df: DataFrame with Transaction ID, Transaction Total and Impressions
+        impressions_df: Impressions table already extracted from data_df
+            (see extract_impressions); its First Impression rows are used
+            instead of parsing the Impressions column again
+
+    Returns:
+        Tuple of (DataFrame with one row per (LINEITEMID, Transaction ID)
+        pair, number of Impressions values that could not be parsed). Pairs
+        are grouped by transaction in journey order, with the Touch Position
+        of each line item in its journey and the Last Impression Position of
+        its last impression.
+    """
+    error_count = 0
+    if impressions_df is None:
+        impressions = data_df["Impressions"].to_numpy(dtype=object)
+        lineitem_lists, position_lists, error_count = extract_lineitem_touches(
+            impressions
+        )
+
+        # Row position of the source transaction for every extracted LINEITEMID
+        lengths = np.fromiter(
+            map(len, lineitem_lists), dtype=np.intp, count=len(lineitem_lists)
+        )
+        row_positions = np.repeat(np.arange(len(lengths)), lengths)
+        lineitem_ids = list(chain.from_iterable(lineitem_lists))
+        last_positions = np.fromiter(
+            chain.from_iterable(position_lists),
+            dtype=np.int64,
+            count=len(lineitem_ids),
+        )
+    else:
+        # First impression of every line item in its journey, in journey order,
+        # with the position of the line item's last impression
+        first = impressions_df[FIRST_IMPRESSION_COLUMN].to_numpy(dtype=bool)
+        last_positions = (
+            impressions_df.groupby([ROW_COLUMN, "LINEITEMID"], sort=False)[
+                POSITION_COLUMN
+            ]
+            .transform("max")
+            .to_numpy(dtype=np.int64)[first]
+        )
+        first_impressions = impressions_df[first]
+        row_positions = first_impressions[ROW_COLUMN].to_numpy(dtype=np.intp)
+        lineitem_ids = first_impressions["LINEITEMID"].to_numpy(dtype=object)
+
+    # Position among the line items of the same transaction
+    journey_starts = np.ones(len(row_positions), dtype=bool)
+    journey_starts[1:] = row_positions[1:] != row_positions[:-1]
+    pair_positions = np.arange(len(row_positions))
+    touch_positions = pair_positions - np.maximum.accumulate(
+        np.where(journey_starts, pair_positions, 0)
+    )
+
+    pairs_df = pd.DataFrame(
+        {
+            "LINEITEMID": lineitem_ids,
+            "Transaction ID": data_df["Transaction ID"].to_numpy()[row_positions],
+            "Transaction Total": data_df["Transaction Total"].to_numpy()[row_positions],
+            TOUCH_POSITION_COLUMN: touch_positions,
+            LAST_IMPRESSION_COLUMN: last_positions,
+        }
+    )
+
+    # Match the dtype inference of building the frame from records
+    return pairs_df.infer_objects(), error_count
+
+
+class LineItemAggregate:
+    """Partial per-LINEITEMID metrics that can be merged with other partials."""
+
+    def __init__(self):
+        """Initialize an empty aggregate."""
+        self.transaction_counts = {}
+        self.transaction_totals = {}
+        self.attributed_totals = {column: {} for column in ATTRIBUTED_REVENUE_COLUMNS}
+        self.source_file_totals = {}
+        self.dedup = TransactionDeduplicator()
+        self.parse_errors = 0
+
+        # Distinct (LINEITEMID, Transaction ID) memberships, integer coded as
+        # lineitem_code << 32 | transaction_code in int64 arrays
+        self._lineitem_codes = {}
+        self._lineitem_values = []
+        self._transaction_codes = {}
+        self._transaction_values = []
+        self._membership_chunks = []
+
+    def __len__(self) -> int:
+        return len(self.transaction_counts)
+
+    @classmethod
+    def from_pairs(cls, pairs_df: pd.DataFrame) -> "LineItemAggregate":
+        """
+        Build an aggregate from transaction-lineitem pairs.
+
+        Args:
+            pairs_df: DataFrame of (LINEITEMID, Transaction ID, Transaction
+                Total, Touch Position, Last Impression Position) from
+                explode_transactions
+
+        Returns:
+            LineItemAggregate for the given pairs
+        """
+        aggregate = cls()
+        if pairs_df.empty:
+            return aggregate
+
+        attributed = attributed_revenue(pairs_df)
+        attributed["LINEITEMID"] = pairs_df["LINEITEMID"]
+        attributed_sums = attributed.groupby("LINEITEMID").sum()
+
+        grouped = pairs_df.groupby("LINEITEMID")
+        aggregate.transaction_counts = grouped["Transaction ID"].count().to_dict()
+        aggregate.transaction_totals = grouped["Transaction Total"].sum().to_dict()
+        aggregate.attributed_totals = {
+            column: attributed_sums[column].to_dict()
+            for column in ATTRIBUTED_REVENUE_COLUMNS
+        }
+        aggregate._add_memberships(
+            pairs_df["LINEITEMID"].to_numpy(dtype=object),
+            pairs_df["Transaction ID"].astype(str).to_numpy(dtype=object),
+        )
+
+        return aggregate
+
+    def merge(self, other: "LineItemAggregate") -> "LineItemAggregate":
+        """
+        Fold another partial aggregate into this one.
+
+        Args:
+            other: Aggregate built from a disjoint slice of transactions
+
+        Returns:
+            This aggregate, updated in place
+        """
+        for lineitem_id, count in other.transaction_counts.items():
+            if lineitem_id in self.transaction_counts:
+                self.transaction_counts[lineitem_id] += count
+                self.transaction_totals[lineitem_id] += other.transaction_totals[
+                    lineitem_id
+                ]
+            else:
+                self.transaction_counts[lineitem_id] = count
+                self.transaction_totals[lineitem_id] = other.transaction_totals[
+                    lineitem_id
+                ]
+
+        for column, totals in other.attributed_totals.items():
+            self_totals = self.attributed_totals[column]
+            for lineitem_id, total in totals.items():
+                self_totals[lineitem_id] = self_totals.get(lineitem_id, 0) + total
+
+        if other._membership_chunks:
+            # Translate the other aggregate's codes into this one's
+            lineitem_map = self._encode(
+                other._lineitem_values, self._lineitem_codes, self._lineitem_values
+            )
+            transaction_map = self._encode(
+                other._transaction_values,
+                self._transaction_codes,
+                self._transaction_values,
+            )
+            keys = np.concatenate(other._membership_chunks)
+            self._append_memberships(
+                lineitem_map[keys >> 32], transaction_map[keys & 0xFFFFFFFF]
+            )
+
+        for source_file, total in other.source_file_totals.items():
+            self.source_file_totals[source_file] = (
+                self.source_file_totals.get(source_file, 0) + total
+            )
+
+        self.dedup.merge(other.dedup)
+        self.parse_errors += other.parse_errors
+        return self
+
+    def add_transactions(self, data_df: pd.DataFrame, dedup: bool = True) -> int:
+        """
+        Fold a slice of transaction rows into this aggregate.
+
+        With dedup enabled, rows whose Transaction ID was already folded in
+        (in this slice or an earlier one) are skipped, matching the
+        first-occurrence rule of load_multiple_transaction_files. Skipped
+        rows and conflicting totals are counted in `dedup`.
+
+        Args:
+            data_df: DataFrame with Transaction ID, Transaction Total and
+                Impressions, plus Source File Name when available
+            dedup: Whether to skip previously seen Transaction IDs
+
+        Returns:
+            Number of rows folded in
+        """
+        if dedup:
+            source = None
+            if "Source File Name" in data_df.columns and len(data_df) > 0:
+                source = data_df["Source File Name"].iloc[0]
+            data_df = data_df[
+                self.dedup.first_occurrence_mask(
+                    data_df["Transaction ID"], data_df["Transaction Total"], source
+                )
+            ]
+
+        if data_df.empty:
+            return 0
+
+        self.merge(aggregate_transactions(data_df))
+
+        if "Source File Name" in data_df.columns:
+            file_totals = data_df.groupby("Source File Name", observed=True)[
+                "Transaction Total"
+            ].sum()
+            for source_file, total in file_totals.items():
+                self.source_file_totals[source_file] = (
+                    self.source_file_totals.get(source_file, 0) + total
+                )
+
+        return len(data_df)
+
+    def _add_memberships(self, lineitem_ids: np.ndarray, transaction_ids: np.ndarray):
+        """Record (LINEITEMID, Transaction ID string) pairs."""
+        lineitem_codes, lineitem_uniques = pd.factorize(lineitem_ids)
+        transaction_codes, transaction_uniques = pd.factorize(transaction_ids)
+
+        # Pairs with a missing LINEITEMID are dropped, as groupby does
+        valid = lineitem_codes >= 0
+        lineitem_map = self._encode(
+            lineitem_uniques, self._lineitem_codes, self._lineitem_values
+        )
+        transaction_map = self._encode(
+            transaction_uniques, self._transaction_codes, self._transaction_values
+        )
+        self._append_memberships(
+            lineitem_map[lineitem_codes[valid]],
+            transaction_map[transaction_codes[valid]],
+        )
+
+    @staticmethod
+    def _encode(values, codes: dict, code_values: list) -> np.ndarray:
+        """Map distinct values to global codes, assigning new codes as needed."""
+        mapping = np.empty(len(values), dtype=np.int64)
+        for position, value in enumerate(values):
+            code = codes.get(value)
+            if code is None:
+                code = len(code_values)
+                codes[value] = code
+                code_values.append(value)
+            mapping[position] = code
+
+        return mapping
+
+    def _append_memberships(
+        self, lineitem_codes: np.ndarray, transaction_codes: np.ndarray
+    ):
+        """Store coded memberships, compacting duplicates now and then."""
+        self._membership_chunks.append(
+            unique_sorted((lineitem_codes << 32) | transaction_codes)
+        )
+        if len(self._membership_chunks) >= MAX_MEMBERSHIP_CHUNKS:
+            self._membership_chunks = [
+                unique_sorted(np.concatenate(self._membership_chunks))
+            ]
+
+    def _sorted_lineitem_ids(self) -> list:
+        """
+        Aggregated LINEITEMIDs in the order the groupby engines produce.
+
+        Journeys can mix numeric and string LINEITEMIDs, which plain sorted()
+        cannot compare; pandas' sort puts numbers before strings instead,
+        falling back to ordering by the string form.
+        """
+        lineitem_ids = np.empty(len(self.transaction_counts), dtype=object)
+        lineitem_ids[:] = list(self.transaction_counts)
+        try:
+            _, uniques = pd.factorize(lineitem_ids, sort=True)
+        except TypeError:
+            return sorted(self.transaction_counts, key=str)
+
+        return list(uniques)
+
+    def to_transaction_index(self) -> TransactionIndex:
+        """
+        Build the Transaction ID membership index for the aggregated line items.
+
+        Returns:
+            TransactionIndex with rows in the same order as to_frame
+        """
+        if not self._membership_chunks:
+            return TransactionIndex.empty()
+
+        keys = unique_sorted(np.concatenate(self._membership_chunks))
+        self._membership_chunks = [keys]
+
+        # Re-number codes so they follow the sorted order of the values
+        lineitem_ids = self._sorted_lineitem_ids()
+        lineitem_rank = np.empty(len(self._lineitem_values), dtype=np.int64)
+        lineitem_rank[[self._lineitem_codes[lid] for lid in lineitem_ids]] = np.arange(
+            len(lineitem_ids)
+        )
+
+        transaction_values = np.asarray(self._transaction_values, dtype=object)
+        transaction_order = np.argsort(transaction_values)
+        transaction_rank = np.empty(len(transaction_values), dtype=np.int64)
+        transaction_rank[transaction_order] = np.arange(len(transaction_values))
+
+        return TransactionIndex.from_codes(
+            lineitem_ids,
+            lineitem_rank[keys >> 32],
+            transaction_values[transaction_order],
+            transaction_rank[keys & 0xFFFFFFFF],
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Convert the aggregate to the per-LINEITEMID frame used by DataProcessor.
+
+        Returns:
+            DataFrame with LINEITEMID, Unique Transaction Count, Total
+            Transaction Amount and ATTRIBUTED_REVENUE_COLUMNS, sorted by
+            LINEITEMID
+        """
+        if not self.transaction_counts:
+            return pd.DataFrame()
+
+        lineitem_ids = self._sorted_lineitem_ids()
+        return pd.DataFrame(
+            {
+                "LINEITEMID": lineitem_ids,
+                "Unique Transaction Count": [
+                    self.transaction_counts[lid] for lid in lineitem_ids
+                ],
+                "Total Transaction Amount": [
+                    self.transaction_totals[lid] for lid in lineitem_ids
+                ],
+                **{
+                    column: [
+                        self.attributed_totals[column][lid] for lid in lineitem_ids
+                    ]
+                    for column in ATTRIBUTED_REVENUE_COLUMNS
+                },
+            }
+        )
+
+    def source_file_frame(self) -> pd.DataFrame:
+        """
+        Convert the per-source-file totals to a frame.
+
+        Returns:
+            DataFrame with Source File Name and Total Transaction Amount, sorted
+            by amount descending
+        """
+        if not self.source_file_totals:
+            return pd.DataFrame()
+
+        source_files = sorted(self.source_file_totals)
+        revenue_by_file = pd.DataFrame(
+            {
+                "Source File Name": source_files,
+                "Total Transaction Amount": [
+                    self.source_file_totals[name] for name in source_files
+                ],
+            }
+        )
+        return revenue_by_file.sort_values("Total Transaction Amount", ascending=False)
+
+
+def aggregate_transactions(data_df: pd.DataFrame) -> LineItemAggregate:
+    """
+    Build a partial aggregate for a slice of transaction data.
+
+    Module-level so it can be sent to worker processes.
+
+    Args:
+        data_df: DataFrame with Transaction ID, Transaction Total and Impressions
+
+    Returns:
+        LineItemAggregate for the slice
+    """
+    pairs_df, error_count = explode_transactions(data_df)
+    aggregate = LineItemAggregate.from_pairs(pairs_df)
+    aggregate.parse_errors = error_count
+    return aggregate
@@ -4,12 +4,352 @@ Streamlit application for Dashboard Transactions Line Item Performance Report.
 
 import streamlit as st
 import pandas as pd
-import io
+from functools import partial
+from math import ceil
+from aggregates import LineItemAggregate
 from data_processor import (
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_LOAD_WORKERS,
     DataProcessor,
-    load_multiple_transaction_files,
+    file_digest,
+    load_transaction_files,
     load_nxn_lookup_file,
 )
+from columnar_io import (
+    COLUMNAR_FORMATS,
+    COLUMNAR_MIME_TYPES,
+    HAS_PYARROW,
+    columnar_bytes,
+)
+from attribution import (
+    ATTRIBUTED_REVENUE_COLUMNS,
+    ATTRIBUTED_ROAS_COLUMNS,
+    ATTRIBUTION_MODELS,
+    revenue_column,
+    roas_column,
+)
+from file_cache import ParsedFileCache
+from impressions import ROW_COLUMN, extract_impressions
+from metrics import ROAS_COLUMN
+from nxn_lookup import NXN_LOOKUP_COLUMNS, NXNLookupIndex
+from report_export import report_sheets, report_workbook_bytes
+from results_query import FILTER_COLUMN, RELEVANCE, SORT_COLUMNS, ResultsQuery
+from transaction_dedup import TransactionDeduplicator
+
+
+@st.cache_resource
+def get_parsed_file_cache():
+    """Shared on-disk cache of parsed uploads, or None if it cannot be created."""
+    try:
+        return ParsedFileCache()
+    except OSError as e:
+        print(f"Warning: Parsed file cache disabled: {str(e)}")
+        return None
+
+
+# Upload types accepted for transaction and lookup files
+INPUT_FILE_TYPES = ["xlsx", "xls", "csv", "parquet", "pq", "arrow", "feather"]
+
+# Options passed to the processor; part of the analysis memoization key
+PROCESSING_OPTIONS = {"chunksize": DEFAULT_CHUNKSIZE}
+
+# Rows per page offered for the report tables
+PAGE_SIZES = [50, 100, 250, 500, 1000]
+
+# Display formats of numeric report columns; applied to the visible page only
+DISPLAY_FORMATS = {
+    "Total Transaction Amount": "${:,.2f}",
+    "NXN Spend": "${:,.2f}",
+    "NXN Impressions": "{:,.0f}",
+    ROAS_COLUMN: "{:.2f}",
+    **dict.fromkeys(ATTRIBUTED_REVENUE_COLUMNS, "${:,.2f}"),
+    **dict.fromkeys(ATTRIBUTED_ROAS_COLUMNS, "{:.2f}"),
+}
+
+# Impression fields shown with a spot-checked transaction's journey
+JOURNEY_FIELDS = ["TIMESTAMP", "CREATIVEID"]
+
+# Attribution choice that shows only the influenced (not deduplicated) metrics
+INFLUENCED_ONLY = "Influenced only"
+
+
+def upload_key(file) -> tuple:
+    """
+    Identify an uploaded file by name and content digest.
+
+    Digests are remembered per upload (Streamlit file_id) so each file is
+    hashed once rather than on every rerun.
+    """
+    file_id = getattr(file, "file_id", None)
+    if file_id is None:
+        return (file.name, file_digest(file))
+
+    digests = st.session_state.setdefault("upload_digests", {})
+    if file_id not in digests:
+        digests[file_id] = file_digest(file)
+
+    return (file.name, digests[file_id])
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_inputs(transaction_keys, nxn_key, _transaction_files, _nxn_file):
+    """
+    Load the uploaded files, memoized on their names and content digests.
+
+    Only the columns the report uses are read, with memory-lean dtypes.
+    Transaction files are parsed concurrently and deduplicated on Transaction
+    ID; the per-file reports (rows, parse time, memory, duplicates, error)
+    and the duplicates with conflicting totals are returned for the Loaded
+    Files section. Returned frames are shared between reruns
+    and sessions and must not be modified in place.
+    """
+    cache = get_parsed_file_cache()
+    dedup = TransactionDeduplicator()
+    data_df, file_reports = load_transaction_files(
+        _transaction_files,
+        cache=cache,
+        workers=DEFAULT_LOAD_WORKERS,
+        lean=True,
+        dedup=dedup,
+    )
+    nxn_lookup_df = load_nxn_lookup_file(
+        _nxn_file, cache=cache, columns=NXN_LOOKUP_COLUMNS
+    )
+
+    return data_df, file_reports, dedup.conflict_frame(), nxn_lookup_df
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_nxn_index(nxn_key, _nxn_lookup_df):
+    """
+    Build the NXN lookup index, memoized on the lookup file's digest.
+
+    Analyses that only change the transaction files reuse the same index.
+    """
+    return NXNLookupIndex.from_frame(_nxn_lookup_df)
+
+
+def loaded_file_frames(data_df: pd.DataFrame, file_reports) -> list:
+    """
+    Split the combined transactions from load_inputs back into per-file frames.
+
+    load_transaction_files concatenates the deduplicated rows of each loaded
+    file in upload order, so each file's rows are a contiguous slice.
+
+    Returns:
+        List aligned with file_reports: each file's rows, or None for files
+        that could not be loaded
+    """
+    frames = []
+    offset = 0
+    for report in file_reports:
+        if report["error"] is not None:
+            frames.append(None)
+            continue
+        kept = report["rows"] - report["duplicates"]
+        frames.append(data_df.iloc[offset : offset + kept])
+        offset += kept
+
+    return frames
+
+
+def get_incremental_processor(
+    transaction_keys,
+    data_df,
+    file_reports,
+    nxn_lookup_df,
+    nxn_index,
+    trace_memory=False,
+) -> DataProcessor:
+    """
+    Get a DataProcessor with every uploaded transaction file folded in.
+
+    The processor is kept in session state between runs. When the upload list
+    only gained files at the end, just the new files are folded into the
+    existing aggregate; any other change rebuilds it from scratch so the
+    first-occurrence Transaction ID dedup keeps following upload order. Files
+    are folded in from the frames load_inputs already parsed; files that
+    failed to load are skipped (load_inputs reports them). Turning memory
+    tracing on or off also rebuilds it, so every stage is traced alike.
+    """
+    processor = st.session_state.get("incremental_processor")
+    folded_keys = st.session_state.get("incremental_keys", [])
+
+    if (
+        processor is None
+        or processor.profiler.trace_memory != trace_memory
+        or transaction_keys[: len(folded_keys)] != folded_keys
+    ):
+        processor = DataProcessor(
+            None,
+            nxn_lookup_df,
+            aggregate=LineItemAggregate(),
+            nxn_index=nxn_index,
+            trace_memory=trace_memory,
+        )
+        folded_keys = []
+
+    file_frames = loaded_file_frames(data_df, file_reports)
+    for file_df, key in zip(
+        file_frames[len(folded_keys) :], transaction_keys[len(folded_keys) :]
+    ):
+        if file_df is not None:
+            processor.add_transactions(
+                file_df, chunksize=PROCESSING_OPTIONS["chunksize"]
+            )
+        folded_keys = folded_keys + [key]
+
+    processor.set_nxn_lookup(nxn_lookup_df, nxn_index)
+    st.session_state["incremental_processor"] = processor
+    st.session_state["incremental_keys"] = folded_keys
+
+    return processor
+
+
+def transaction_journey(data_df: pd.DataFrame, transaction_id: str) -> pd.DataFrame:
+    """
+    Parse the impression journey of one transaction from the loaded rows.
+
+    Only the matching rows are parsed, with the same extractor that builds
+    impressions tables; JOURNEY_FIELDS missing from every impression are
+    left out.
+
+    The app does not read this from DataProcessor.get_impressions: its
+    processor folds uploads into a LineItemAggregate (see
+    get_incremental_processor), which keeps only LINEITEMIDs, and holding a
+    table of every impression's JOURNEY_FIELDS in session state to show one
+    journey at a time would cost far more memory than parsing its rows.
+    """
+    rows = data_df[data_df["Transaction ID"].astype(str) == transaction_id]
+    impressions_df, _ = extract_impressions(
+        rows["Impressions"].to_numpy(dtype=object), JOURNEY_FIELDS
+    )
+    return impressions_df.drop(columns=[ROW_COLUMN]).dropna(axis=1, how="all")
+
+
+def format_for_display(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Format the DISPLAY_FORMATS columns of a page of rows as text.
+
+    Missing values are shown as empty cells. Totals must be computed from the
+    unformatted values before calling this.
+    """
+    df = df.copy()
+    for column, display_format in DISPLAY_FORMATS.items():
+        if column in df.columns:
+            df[column] = [
+                display_format.format(value) if pd.notna(value) else ""
+                for value in df[column]
+            ]
+
+    return df
+
+
+def page_slice(total_rows: int, key: str) -> slice:
+    """
+    Show page controls for a table and return the rows of the current page.
+
+    Args:
+        total_rows: Number of rows in the table
+        key: Widget key prefix, unique per table
+    """
+    size_col, page_col, info_col = st.columns([1, 1, 3])
+    with size_col:
+        page_size = st.selectbox(
+            "Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size"
+        )
+
+    # Keep the page in range when filters shrink the table
+    pages = max(1, ceil(total_rows / page_size))
+    page_key = f"{key}_page"
+    st.session_state[page_key] = min(st.session_state.get(page_key, 1), pages)
+
+    with page_col:
+        page = st.number_input(
+            f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=page_key
+        )
+
+    start = (page - 1) * page_size
+    end = min(start + page_size, total_rows)
+    with info_col:
+        if total_rows:
+            st.caption(f"Showing rows {start + 1:,}–{end:,} of {total_rows:,}")
+
+    return slice(start, end)
+
+
+def run_analysis(
+    transaction_keys,
+    data_df,
+    file_reports,
+    nxn_lookup_df,
+    nxn_index,
+    analysis_key,
+    trace_memory=False,
+):
+    """
+    Process the uploads and store everything the results view needs.
+
+    Results, summary statistics and the source file breakdown are computed
+    once per analysis key and kept in session state, and the results are
+    loaded into a ResultsQuery engine, so widget interactions only run
+    queries. Returns False if no line items were found.
+    """
+    analysis = st.session_state.get("analysis")
+    if analysis is not None and analysis["key"] == analysis_key:
+        return True
+
+    processor = get_incremental_processor(
+        transaction_keys,
+        data_df,
+        file_reports,
+        nxn_lookup_df,
+        nxn_index,
+        trace_memory=trace_memory,
+    )
+    results_df = processor.process_transactions()
+    if results_df.empty:
+        return False
+
+    st.session_state["analysis"] = {
+        "key": analysis_key,
+        "processor": processor,
+        "results_df": results_df,
+        "query": ResultsQuery(results_df, processor.get_lineitem_pairs),
+        "summary": processor.get_summary_stats(),
+        "revenue_by_file": processor.get_revenue_by_source_file(),
+    }
+    return True
+
+
+def build_excel_report(analysis) -> bytes:
+    """Build the multi-sheet Excel report for a stored analysis."""
+    processor = analysis["processor"]
+    return report_workbook_bytes(
+        report_sheets(
+            processor.get_results_with_transaction_ids(),
+            processor.unmatched_nxn_df,
+            analysis["revenue_by_file"],
+        )
+    )
+
+
+def build_csv_report(analysis) -> str:
+    """Build the CSV export of the line item results for a stored analysis."""
+    return analysis["processor"].get_results_with_transaction_ids().to_csv(index=False)
+
+
+def build_columnar_export(analysis, table: str, fmt: str) -> bytes:
+    """Build a Parquet/Arrow export of one report table for a stored analysis."""
+    processor = analysis["processor"]
+    if table == "results":
+        df = processor.get_results_with_transaction_ids()
+    elif table == "unmatched":
+        df = processor.unmatched_nxn_df
+    else:
+        df = processor.get_lineitem_pairs()
+
+    return columnar_bytes(df, fmt)
 
 
 def line_item_performance_report():
@@ -32,9 +372,9 @@ def line_item_performance_report():
         st.subheader("Transaction Detail Files")
         transaction_files = st.file_uploader(
             "Upload one or more Dashboard Transaction Events files",
-            type=["xlsx", "xls", "csv"],
+            type=INPUT_FILE_TYPES,
             accept_multiple_files=True,
-            help="Supports Excel (.xlsx, .xls) or CSV (.csv) files with transaction and impression data",
+            help="Supports Excel (.xlsx, .xls), CSV (.csv) or Parquet/Arrow (.parquet, .arrow) files with transaction and impression data",
             key="transaction_files",
         )
 
@@ -42,21 +382,51 @@ def line_item_performance_report():
         st.subheader("NXN Lookup File")
         nxn_file = st.file_uploader(
             "Upload Line Item Lookup file",
-            type=["xlsx", "xls", "csv"],
-            help="Supports Excel (.xlsx, .xls) or CSV (.csv) with line item lookup data",
+            type=INPUT_FILE_TYPES,
+            help="Supports Excel (.xlsx, .xls), CSV (.csv) or Parquet/Arrow (.parquet, .arrow) with line item lookup data",
             key="nxn_file",
         )
 
     if transaction_files and nxn_file:
         try:
-            # Load data
+            # Load data (memoized on file contents, so reruns skip this)
+            transaction_keys = [upload_key(file) for file in transaction_files]
+            nxn_key = upload_key(nxn_file)
+            analysis_key = (
+                tuple(transaction_keys),
+                nxn_key,
+                tuple(sorted(PROCESSING_OPTIONS.items())),
+            )
+
             with st.spinner("Loading files..."):
-                data_df = load_multiple_transaction_files(transaction_files)
-                nxn_lookup_df = load_nxn_lookup_file(nxn_file)
+                data_df, file_reports, conflicts_df, nxn_lookup_df = load_inputs(
+                    tuple(transaction_keys), nxn_key, transaction_files, nxn_file
+                )
+                nxn_index = load_nxn_index(nxn_key, nxn_lookup_df)
 
+            failed_reports = [r for r in file_reports if r["error"] is not None]
             st.success(
-                f"✓ Loaded {len(transaction_files)} transaction file(s) with {len(data_df):,} total transactions"
+                f"✓ Loaded {len(file_reports) - len(failed_reports)} transaction file(s) with {len(data_df):,} total transactions"
             )
+            for report in failed_reports:
+                st.warning(f"⚠ Could not load {report['file_name']}: {report['error']}")
+            duplicate_count = sum(r["duplicates"] for r in file_reports)
+            conflict_count = sum(r["conflicts"] for r in file_reports)
+            if duplicate_count > 0:
+                st.info(
+                    f"ℹ Skipped {duplicate_count:,} duplicate Transaction ID row(s) "
+                    "(the first occurrence in upload order is kept)"
+                )
+            if conflict_count > 0:
+                st.warning(
+                    f"⚠ {conflict_count:,} duplicate Transaction ID(s) have a different "
+                    "Transaction Total than the kept row. Check for overlapping "
+                    "exports with restated totals."
+                )
+                with st.expander("View Conflicting Duplicates"):
+                    st.dataframe(
+                        conflicts_df, use_container_width=True, hide_index=True
+                    )
             st.success(f"✓ Loaded {len(nxn_lookup_df)} NXN line items from lookup file")
 
             # Display data preview
@@ -66,7 +436,7 @@ def line_item_performance_report():
 
                 st.subheader("NXN LINE ITEM ID DELIVERY LOOKUP (First 10 rows)")
                 st.markdown(
-                    "*Showing all columns - scroll horizontally to view full data*"
+                    "*Showing the columns used by the report - scroll horizontally to view full data*"
                 )
                 # Configure column settings to show full content
                 st.dataframe(
@@ -93,33 +463,71 @@ def line_item_performance_report():
                 # Show file details
                 st.subheader("📄 Loaded Files")
                 st.write("**Transaction Files:**")
-                for i, file in enumerate(transaction_files, 1):
-                    st.write(f"{i}. {file.name}")
+                st.dataframe(
+                    pd.DataFrame(
+                        {
+                            "File": [r["file_name"] for r in file_reports],
+                            "Rows": [r["rows"] for r in file_reports],
+                            "Parse Time (s)": [r["seconds"] for r in file_reports],
+                            "Memory (MB)": [
+                                r["memory_bytes"] / 1e6 for r in file_reports
+                            ],
+                            "Saved (MB)": [
+                                r["memory_saved_bytes"] / 1e6 for r in file_reports
+                            ],
+                            "Duplicates": [r["duplicates"] for r in file_reports],
+                            "Conflicts": [r["conflicts"] for r in file_reports],
+                            "Error": [r["error"] or "" for r in file_reports],
+                        }
+                    ),
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Rows": st.column_config.NumberColumn(format="%d"),
+                        "Parse Time (s)": st.column_config.NumberColumn(format="%.2f"),
+                        "Memory (MB)": st.column_config.NumberColumn(format="%.1f"),
+                        "Saved (MB)": st.column_config.NumberColumn(format="%.1f"),
+                    },
+                )
                 st.write(f"**NXN Lookup File:** {nxn_file.name}")
 
             # Process data
             st.header("2. Process Data")
+            trace_memory = st.checkbox(
+                "Trace per-stage memory (slower)",
+                help="Record the peak memory allocated by each processing stage "
+                "in the diagnostics. Tracing slows processing down.",
+                key="trace_memory",
+            )
+            analysis_key = analysis_key + (trace_memory,)
             if st.button("🔄 Analyze Line Item Performance", type="primary"):
                 with st.spinner("Processing transaction data..."):
-                    processor = DataProcessor(data_df, nxn_lookup_df)
-                    results_df = processor.process_transactions()
-
-                    if results_df.empty:
+                    if not run_analysis(
+                        transaction_keys,
+                        data_df,
+                        file_reports,
+                        nxn_lookup_df,
+                        nxn_index,
+                        analysis_key,
+                        trace_memory=trace_memory,
+                    ):
                         st.error(
                             "No line item data found in transactions. Please check your data."
                         )
                         return
 
-                    # Store results in session state
-                    st.session_state["results_df"] = results_df
-                    st.session_state["processor"] = processor
-
                 st.success("✓ Analysis complete!")
 
             # Display results
-            if "results_df" in st.session_state:
-                results_df = st.session_state["results_df"]
-                processor = st.session_state["processor"]
+            analysis = st.session_state.get("analysis")
+            if analysis is not None and analysis["key"] != analysis_key:
+                st.info(
+                    "Uploaded files or options changed since the last analysis. "
+                    "Click Analyze to update the results."
+                )
+            elif analysis is not None:
+                results_df = analysis["results_df"]
+                processor = analysis["processor"]
 
                 st.header("3. Results")
 
@@ -135,7 +543,7 @@ def line_item_performance_report():
                 )
 
                 # Summary metrics
-                summary = processor.get_summary_stats()
+                summary = analysis["summary"]
                 col1, col2, col3, col4 = st.columns(4)
 
                 with col1:
@@ -169,16 +577,12 @@ def line_item_performance_report():
                 st.subheader("Filter Results")
                 col1, col2 = st.columns(2)
 
+                query = analysis["query"]
+
                 with col1:
                     # Get unique insertion order names (handle NaN values)
-                    if "Insertion Order Name" in results_df.columns:
-                        unique_insertion_orders = sorted(
-                            [
-                                x
-                                for x in results_df["Insertion Order Name"].unique()
-                                if pd.notna(x)
-                            ]
-                        )
+                    if FILTER_COLUMN in query.columns:
+                        unique_insertion_orders = query.insertion_orders()
                         insertion_order_filter = st.multiselect(
                             "Insertion Order Name",
                             options=unique_insertion_orders,
@@ -189,40 +593,16 @@ def line_item_performance_report():
 
                 with col2:
                     search_term = st.text_input(
-                        "Search LINEITEMID or Name", placeholder="Enter search term..."
+                        "Search LINEITEMID, Line Item, IO or Advertiser Name",
+                        placeholder="Enter search term...",
+                        help="Case-insensitive; pick 'Search Relevance' in Sort by "
+                        "to list exact and prefix matches first",
                     )
 
-                # Apply filters
-                filtered_df = results_df.copy()
-
-                if (
-                    insertion_order_filter
-                    and "Insertion Order Name" in filtered_df.columns
-                ):
-                    filtered_df = filtered_df[
-                        filtered_df["Insertion Order Name"].isin(insertion_order_filter)
-                    ]
-
-                if search_term:
-                    filtered_df = filtered_df[
-                        filtered_df["LINEITEMID"].str.contains(
-                            search_term, case=False, na=False
-                        )
-                        | filtered_df["NXN Line Item Name"].str.contains(
-                            search_term, case=False, na=False
-                        )
-                    ]
-
                 # Sort options
                 sort_col = st.selectbox(
                     "Sort by",
-                    options=[
-                        "Unique Transaction Count",
-                        "Total Transaction Amount",
-                        "NXN Spend",
-                        "Influenced ROAS (Not Deduplicated)",
-                        "LINEITEMID",
-                    ],
+                    options=[*SORT_COLUMNS, RELEVANCE],
                     index=1,
                 )
 
@@ -231,14 +611,26 @@ def line_item_performance_report():
                 )
                 ascending = sort_order == "Ascending"
 
-                # Sort data
-                if sort_col in filtered_df.columns:
-                    filtered_df = filtered_df.sort_values(
-                        by=sort_col, ascending=ascending, na_position="last"
-                    )
+                attribution_model = st.selectbox(
+                    "Attribution model",
+                    options=[INFLUENCED_ONLY, *ATTRIBUTION_MODELS],
+                    format_func=lambda model: ATTRIBUTION_MODELS.get(model, model),
+                    help="Adds deduplicated revenue and ROAS columns: each "
+                    "transaction's revenue is split between the line items in "
+                    "its journey (Position-Based gives 40% each to the first "
+                    "and last touch and splits 20% over the rest)",
+                )
+
+                # Filter, search and sort in the query engine; rows are only
+                # taken from the results for the page being shown
+                filtered_positions = query.positions(
+                    insertion_order_filter, search_term, sort_col, ascending
+                )
 
                 # Display results table
-                st.subheader(f"Line Item Performance ({len(filtered_df)} records)")
+                st.subheader(
+                    f"Line Item Performance ({len(filtered_positions)} records)"
+                )
                 st.markdown(
                     """
                     <div style="background-color: #e3f2fd; padding: 12px; border-radius: 5px; margin: 10px 0;">
@@ -261,31 +653,8 @@ def line_item_performance_report():
                     unsafe_allow_html=True,
                 )
 
-                # Calculate totals before formatting (need numeric values)
-                total_row_data = {}
-                numeric_columns = {
-                    "Unique Transaction Count": "sum",
-                    "Total Transaction Amount": "sum",
-                    "NXN Impressions": "sum",
-                    "NXN Spend": "sum",
-                }
-
-                # Calculate totals for numeric columns
-                for col, agg_func in numeric_columns.items():
-                    if col in filtered_df.columns:
-                        if agg_func == "sum":
-                            total_row_data[col] = filtered_df[col].sum()
-
-                # Calculate overall ROAS for the filtered data
-                if (
-                    "Total Transaction Amount" in total_row_data
-                    and "NXN Spend" in total_row_data
-                ):
-                    if total_row_data["NXN Spend"] > 0:
-                        total_row_data["Influenced ROAS (Not Deduplicated)"] = (
-                            total_row_data["Total Transaction Amount"]
-                            / total_row_data["NXN Spend"]
-                        )
+                # Totals come from the unformatted values in the query engine
+                total_row_data = query.totals(insertion_order_filter, search_term)
 
                 # Rearrange columns in desired order (hide Match Status)
                 desired_column_order = [
@@ -303,41 +672,17 @@ def line_item_performance_report():
                     "Influenced ROAS (Not Deduplicated)",
                     "Transaction IDs",
                 ]
-
-                # Filter to only include columns that exist in the dataframe
-                columns_to_display = [
-                    col for col in desired_column_order if col in filtered_df.columns
-                ]
-
-                # Reorder the dataframe
-                display_df = filtered_df[columns_to_display].copy()
-
-                # Format numbers
-                if "Total Transaction Amount" in display_df.columns:
-                    display_df["Total Transaction Amount"] = display_df[
-                        "Total Transaction Amount"
-                    ].apply(lambda x: f"${x:,.2f}" if pd.notna(x) else "")
-
-                if "NXN Spend" in display_df.columns:
-                    display_df["NXN Spend"] = display_df["NXN Spend"].apply(
-                        lambda x: f"${x:,.2f}" if pd.notna(x) else ""
-                    )
-
-                if "NXN Impressions" in display_df.columns:
-                    display_df["NXN Impressions"] = display_df["NXN Impressions"].apply(
-                        lambda x: f"{x:,.0f}" if pd.notna(x) else ""
-                    )
-
-                if "Influenced ROAS (Not Deduplicated)" in display_df.columns:
-                    display_df["Influenced ROAS (Not Deduplicated)"] = display_df[
-                        "Influenced ROAS (Not Deduplicated)"
-                    ].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "")
+                if attribution_model != INFLUENCED_ONLY:
+                    desired_column_order[-1:-1] = [
+                        revenue_column(attribution_model),
+                        roas_column(attribution_model),
+                    ]
 
                 # Display total row first (pinned at top)
                 st.markdown("### Totals")
                 total_cols = st.columns(6)
                 with total_cols[0]:
-                    st.metric("Total Line Items", len(filtered_df))
+                    st.metric("Total Line Items", len(filtered_positions))
                 with total_cols[1]:
                     if "Unique Transaction Count" in total_row_data:
                         st.metric(
@@ -366,11 +711,60 @@ def line_item_performance_report():
                             f"{total_row_data['Influenced ROAS (Not Deduplicated)']:.2f}",
                         )
 
+                if attribution_model != INFLUENCED_ONLY:
+                    model_label = ATTRIBUTION_MODELS[attribution_model]
+                    model_cols = st.columns(6)
+                    with model_cols[2]:
+                        if revenue_column(attribution_model) in total_row_data:
+                            st.metric(
+                                f"{model_label} Revenue",
+                                f"${total_row_data[revenue_column(attribution_model)]:,.2f}",
+                            )
+                    with model_cols[5]:
+                        if roas_column(attribution_model) in total_row_data:
+                            st.metric(
+                                f"{model_label} ROAS",
+                                f"{total_row_data[roas_column(attribution_model)]:.2f}",
+                            )
+
                 st.markdown("---")
 
-                # Display table without total row (since it's shown above)
+                # Display the current page without total row (since it's shown
+                # above). Transaction IDs are stored compactly and only turned
+                # into strings for the rows on the page.
+                page = page_slice(len(filtered_positions), "results")
+                display_df = processor.get_results_with_transaction_ids(
+                    results_df.iloc[filtered_positions[page]]
+                )
+                columns_to_display = [
+                    col for col in desired_column_order if col in display_df.columns
+                ]
+                display_df = format_for_display(display_df[columns_to_display])
                 st.dataframe(display_df, use_container_width=True, height=600)
 
+                # Spot check which line items a transaction was attributed to
+                spot_check_id = st.text_input(
+                    "Spot check a Transaction ID",
+                    placeholder="Enter a Transaction ID...",
+                )
+                if spot_check_id:
+                    spot_check_lineitems = query.lineitems_for_transaction(
+                        spot_check_id.strip()
+                    )
+                    if spot_check_lineitems:
+                        st.write(
+                            f"Transaction {spot_check_id.strip()} appears in the "
+                            f"journeys of {len(spot_check_lineitems)} line item(s): "
+                            + ", ".join(spot_check_lineitems)
+                        )
+                    else:
+                        st.info("No line items found for this Transaction ID")
+
+                    journey_df = transaction_journey(data_df, spot_check_id.strip())
+                    if not journey_df.empty:
+                        st.caption("Impression journey")
+                        st.dataframe(journey_df, use_container_width=True)
+
                 # QA Section - NXN Line Items with No Transactions
                 st.subheader("NXN Line Items Not Matched to Transactions")
                 if (
@@ -389,20 +783,11 @@ def line_item_performance_report():
                         f"⚠ {len(processor.unmatched_nxn_df)} line items in NXN file have no matching transactions. Total spend: ${total_unmatched_spend_value:,.2f}"
                     )
 
-                    # Now format for display
-                    unmatched_nxn_display = processor.unmatched_nxn_df.copy()
-
-                    # Format numeric columns
-                    if "NXN Spend" in unmatched_nxn_display.columns:
-                        unmatched_nxn_display["NXN Spend"] = unmatched_nxn_display[
-                            "NXN Spend"
-                        ].apply(lambda x: f"${x:,.2f}" if pd.notna(x) else "")
-                    if "NXN Impressions" in unmatched_nxn_display.columns:
-                        unmatched_nxn_display["NXN Impressions"] = (
-                            unmatched_nxn_display["NXN Impressions"].apply(
-                                lambda x: f"{x:,.0f}" if pd.notna(x) else ""
-                            )
-                        )
+                    # Now format the current page for display
+                    page = page_slice(len(processor.unmatched_nxn_df), "unmatched")
+                    unmatched_nxn_display = format_for_display(
+                        processor.unmatched_nxn_df.iloc[page]
+                    )
 
                     # Define column order matching Line Item Performance
                     desired_column_order = [
@@ -531,17 +916,15 @@ def line_item_performance_report():
 
                 # Revenue by Source File
                 st.markdown("#### Total Transaction Amount by Source File")
-                revenue_by_file = processor.get_revenue_by_source_file()
+                revenue_by_file = analysis["revenue_by_file"]
                 if not revenue_by_file.empty:
                     # Calculate total before formatting
                     total_revenue = revenue_by_file["Total Transaction Amount"].sum()
 
-                    # Format the display values
+                    # Format the display values (one row per source file)
                     revenue_display = revenue_by_file.copy()
                     revenue_display["Total Transaction Amount (Formatted)"] = (
-                        revenue_display["Total Transaction Amount"].apply(
-                            lambda x: f"${x:,.2f}" if pd.notna(x) else ""
-                        )
+                        format_for_display(revenue_by_file)["Total Transaction Amount"]
                     )
 
                     # Add total row
@@ -584,34 +967,59 @@ def line_item_performance_report():
                 # Export functionality
                 st.header("4. Export Results")
 
+                # Files are built only when a download button is clicked
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    # Export to Excel
-                    output = io.BytesIO()
-                    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                        results_df.to_excel(
-                            writer, sheet_name="Line Item Performance", index=False
-                        )
-                    output.seek(0)
-
+                    # Export to Excel (one sheet per report table)
                     st.download_button(
                         label="📥 Download Excel Report",
-                        data=output,
+                        data=partial(build_excel_report, analysis),
                         file_name="line_item_performance_report.xlsx",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                     )
 
                 with col2:
                     # Export to CSV
-                    csv = results_df.to_csv(index=False)
                     st.download_button(
                         label="📥 Download CSV Report",
-                        data=csv,
+                        data=partial(build_csv_report, analysis),
                         file_name="line_item_performance_report.csv",
                         mime="text/csv",
                     )
 
+                # Columnar exports keep dtypes for downstream jobs
+                if HAS_PYARROW:
+                    st.markdown("#### Columnar Exports")
+                    columnar_format = st.radio(
+                        "Format",
+                        options=list(COLUMNAR_FORMATS),
+                        format_func=lambda fmt: fmt.capitalize(),
+                        horizontal=True,
+                    )
+                    extension = COLUMNAR_FORMATS[columnar_format]
+                    columnar_tables = {
+                        "results": "Results",
+                        "unmatched": "Unmatched NXN Items",
+                        "pairs": "Line Item / Transaction Pairs",
+                    }
+                    for col, (table, label) in zip(
+                        st.columns(len(columnar_tables)), columnar_tables.items()
+                    ):
+                        with col:
+                            st.download_button(
+                                label=f"📥 {label}",
+                                data=partial(
+                                    build_columnar_export,
+                                    analysis,
+                                    table,
+                                    columnar_format,
+                                ),
+                                file_name=f"line_item_{table}{extension}",
+                                mime=COLUMNAR_MIME_TYPES[columnar_format],
+                                key=f"columnar_{table}",
+                            )
+
                 # Warnings for unmatched items
                 if summary["unmatched_lineitems"] > 0:
                     st.warning(
@@ -631,6 +1039,48 @@ def line_item_performance_report():
                         ]
                         st.dataframe(unmatched, use_container_width=True)
 
+                with st.expander("🩺 Processing Diagnostics"):
+                    stage_stats = processor.get_stage_stats()
+                    st.caption(
+                        f"Total processing time: {stage_stats['seconds'].sum():.2f}s"
+                    )
+                    diagnostics_df = pd.DataFrame(
+                        {
+                            "Stage": stage_stats["stage"],
+                            "Time (s)": stage_stats["seconds"],
+                            "Rows In": stage_stats["rows_in"],
+                            "Rows Out": stage_stats["rows_out"],
+                            "Peak Traced (MB)": stage_stats["peak_traced_bytes"] / 1e6,
+                            "Process Peak RSS (MB)": stage_stats["max_rss_bytes"] / 1e6,
+                        }
+                    )
+                    if diagnostics_df["Peak Traced (MB)"].isna().all():
+                        diagnostics_df = diagnostics_df.drop(
+                            columns=["Peak Traced (MB)"]
+                        )
+                    st.caption(
+                        "Process Peak RSS is the peak memory of the whole app "
+                        "process so far, not of each stage. Turn on "
+                        "*Trace per-stage memory* before analyzing to see each "
+                        "stage's own peak."
+                    )
+                    st.dataframe(
+                        diagnostics_df,
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            "Time (s)": st.column_config.NumberColumn(format="%.3f"),
+                            "Rows In": st.column_config.NumberColumn(format="%d"),
+                            "Rows Out": st.column_config.NumberColumn(format="%d"),
+                            "Peak Traced (MB)": st.column_config.NumberColumn(
+                                format="%.1f"
+                            ),
+                            "Process Peak RSS (MB)": st.column_config.NumberColumn(
+                                format="%.1f"
+                            ),
+                        },
+                    )
+
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
             st.exception(e)
@@ -646,7 +1096,7 @@ def line_item_performance_report():
             ### Required Files
 
             **Transaction Detail Files (one or more)**
-            - Supports: **Excel** (.xlsx, .xls) or **CSV** (.csv) files
+            - Supports: **Excel** (.xlsx, .xls), **CSV** (.csv) or **Parquet/Arrow** (.parquet, .arrow) files
             - Excel files: Must contain a **DATA** tab
             - CSV files: Must have column headers in the first row
             - Required columns:
@@ -657,7 +1107,7 @@ def line_item_performance_report():
             - Duplicate transactions (same Transaction ID) will be removed
 
             **NXN Lookup File (one file)**
-            - Supports: **Excel** (.xlsx, .xls) or **CSV** (.csv) files
+            - Supports: **Excel** (.xlsx, .xls), **CSV** (.csv) or **Parquet/Arrow** (.parquet, .arrow) files
             - Excel formats:
               1. **NXN LINE ITEM ID DELIVERY LOOKUP** sheet
               2. **Programmatic** sheet (Green Soul format)
@@ -679,6 +1129,7 @@ def line_item_performance_report():
             6. Aggregates transaction counts and amounts by LINEITEMID
             7. Joins with NXN lookup data to add names, spend, and other metrics
             8. Calculates Influenced ROAS = Total Transaction Amount / DSP Spend
+            9. Splits each transaction's revenue between the line items in its journey for the deduplicated attribution models
 
             ### Output Columns
 
@@ -690,6 +1141,7 @@ def line_item_performance_report():
             - **NXN Impressions**: Impression count from lookup table
             - **NXN Spend**: Advertiser invoice amount from lookup table
             - **Influenced ROAS (Not Deduplicated)**: Revenue / Spend ratio
+            - **Even Split / First Touch / Last Touch / Position-Based Revenue and ROAS**: Deduplicated revenue credited to the line item by each attribution model (touch order is each line item's first impression in the journey; the last touch is the line item of the journey's final impression), and that revenue / Spend
             - **Match Status**: Whether the line item was found in NXN lookup
 
             ### Tips
@@ -0,0 +1,165 @@
+"""
+Deduplicated multi-touch attribution over transaction-lineitem pairs.
+
+Influenced ROAS credits every line item in a journey with the whole
+Transaction Total, so revenue is counted once per line item touched. The
+models here split each transaction's revenue between the line items in its
+journey instead, so each model's revenue sums to the deduplicated total.
+Every model is computed from the same exploded pairs in one vectorized pass:
+a pair's weight only depends on its touch position and the journey length.
+
+Touch order is the order in which each line item first appears in the
+Impressions journey. A line item repeated in a journey is still one touch: it
+is the first touch if it made the journey's first impression and the last
+touch if it made the journey's last impression. In the journey [A, B, A], A
+takes all the First Touch and Last Touch revenue and, under Position-Based,
+both endpoint shares, while B takes the middle share.
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from metrics import calculate_roas
+
+# Attribution models and their report labels
+ATTRIBUTION_MODELS = {
+    "even": "Even Split",
+    "first_touch": "First Touch",
+    "last_touch": "Last Touch",
+    "position_based": "Position-Based",
+}
+
+# Position-based share of the first and of the last touch; the rest is split
+# evenly between the touches in between
+POSITION_BASED_ENDPOINT_SHARE = 0.4
+
+# 0-based position of a line item within its transaction's journey
+TOUCH_POSITION_COLUMN = "Touch Position"
+
+# 0-based position of a line item's last impression in its transaction's
+# journey (among all impressions, so repeats are counted)
+LAST_IMPRESSION_COLUMN = "Last Impression Position"
+
+
+def revenue_column(model: str) -> str:
+    """Report column with a model's attributed revenue."""
+    return f"{ATTRIBUTION_MODELS[model]} Revenue"
+
+
+def roas_column(model: str) -> str:
+    """Report column with a model's attributed revenue over spend."""
+    return f"{ATTRIBUTION_MODELS[model]} ROAS"
+
+
+ATTRIBUTED_REVENUE_COLUMNS = [revenue_column(model) for model in ATTRIBUTION_MODELS]
+ATTRIBUTED_ROAS_COLUMNS = [roas_column(model) for model in ATTRIBUTION_MODELS]
+
+
+def touch_weights(
+    touch_positions: np.ndarray, last_impression_positions: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Compute each pair's share of its transaction under every model.
+
+    Pairs must be grouped by transaction in journey order, as produced by
+    explode_transactions, so every journey starts at touch position 0. The
+    first touch is the pair at touch position 0 and the last touch is the
+    pair whose last impression comes last in the journey.
+
+    Args:
+        touch_positions: Touch position of every pair
+        last_impression_positions: Position of every pair's last impression
+            in its journey
+
+    Returns:
+        Dict of model name -> float array of weights; the weights of each
+        journey sum to 1 for every model
+    """
+    positions = np.asarray(touch_positions, dtype=np.int64)
+    if len(positions) == 0:
+        return {model: np.zeros(0) for model in ATTRIBUTION_MODELS}
+    last_positions = np.asarray(last_impression_positions, dtype=np.int64)
+
+    # Journey number and length of every pair
+    first = positions == 0
+    journeys = np.cumsum(first) - 1
+    lengths = np.bincount(journeys)[journeys]
+
+    last = (
+        last_positions
+        == np.maximum.reduceat(last_positions, np.flatnonzero(first))[journeys]
+    )
+
+    # 40/20/40: the endpoint touches take a fixed share each (a line item
+    # that is both takes both) and the middle touches split the remainder;
+    # without middle touches the remainder goes to the endpoints, so one- and
+    # two-touch journeys split evenly
+    endpoint = first | last
+    middle_counts = np.bincount(journeys, weights=~endpoint)[journeys]
+    endpoint_counts = np.bincount(journeys, weights=endpoint)[journeys]
+    remainder = 1 - 2 * POSITION_BASED_ENDPOINT_SHARE
+    position_based = POSITION_BASED_ENDPOINT_SHARE * (
+        first.astype(np.float64) + last
+    ) + np.where(
+        middle_counts > 0,
+        np.where(endpoint, 0.0, remainder / np.maximum(middle_counts, 1)),
+        np.where(endpoint, remainder / np.maximum(endpoint_counts, 1), 0.0),
+    )
+
+    return {
+        "even": 1 / lengths,
+        "first_touch": first.astype(np.float64),
+        "last_touch": last.astype(np.float64),
+        "position_based": position_based,
+    }
+
+
+def attributed_revenue(pairs_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Split each pair's Transaction Total by the touch weights of every model.
+
+    Args:
+        pairs_df: DataFrame of (LINEITEMID, Transaction ID, Transaction
+            Total, Touch Position, Last Impression Position) from
+            explode_transactions
+
+    Returns:
+        DataFrame aligned with pairs_df with one ATTRIBUTED_REVENUE_COLUMNS
+        column per model, ready to be summed by LINEITEMID
+    """
+    totals = pd.to_numeric(pairs_df["Transaction Total"], errors="coerce").to_numpy(
+        dtype=np.float64
+    )
+    weights = touch_weights(
+        pairs_df[TOUCH_POSITION_COLUMN].to_numpy(),
+        pairs_df[LAST_IMPRESSION_COLUMN].to_numpy(),
+    )
+
+    return pd.DataFrame(
+        {
+            revenue_column(model): totals * weights[model]
+            for model in ATTRIBUTION_MODELS
+        },
+        index=pairs_df.index,
+    )
+
+
+def add_attributed_roas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add a ROAS column for every model with attributed revenue in df.
+
+    Args:
+        df: Results with ATTRIBUTED_REVENUE_COLUMNS and NXN Spend
+
+    Returns:
+        df with ATTRIBUTED_ROAS_COLUMNS added (in place)
+    """
+    for model in ATTRIBUTION_MODELS:
+        if revenue_column(model) in df.columns:
+            df[roas_column(model)] = calculate_roas(
+                df[revenue_column(model)], df["NXN Spend"]
+            )
+
+    return df
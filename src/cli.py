@@ -0,0 +1,335 @@
+"""
+Command-line entry point for batch runs of the Line Item Performance Report.
+
+Loads every transaction file matching the input globs plus the NXN lookup
+file, processes them with DataProcessor and writes the report tables, then
+prints how long each step took and the per-stage profile of the processing. Intended for cron jobs and batch schedulers
+that should not drive the Streamlit UI.
+
+Usage:
+    poetry run python src/cli.py "exports/*.xlsx" --lookup lookup.xlsx \\
+        --output reports/ --format xlsx --workers 4
+"""
+
+import argparse
+import glob
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from columnar_io import COLUMNAR_FORMATS, write_columnar
+from data_processor import (
+    DEFAULT_CHUNKSIZE,
+    DataProcessor,
+    aggregate_transaction_files,
+    load_nxn_lookup_file,
+    load_transaction_files,
+)
+from nxn_lookup import NXN_LOOKUP_COLUMNS
+from report_export import report_sheets, write_report_workbook
+from transaction_dedup import TransactionDeduplicator, conflict_examples_text
+
+OUTPUT_FORMATS = ("xlsx", "csv", *COLUMNAR_FORMATS)
+
+REPORT_NAME = "line_item_performance_report"
+
+
+class StageTimer:
+    """Collects wall-clock timings of named pipeline stages."""
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def report(self) -> str:
+        """Format the timings as an aligned table with a total line."""
+        width = max([len(name) for name, _ in self.stages] + [len("total")])
+        lines = [f"{name:<{width}}  {seconds:8.2f}s" for name, seconds in self.stages]
+        total = sum(seconds for _, seconds in self.stages)
+        lines.append(f"{'total':<{width}}  {total:8.2f}s")
+        return "\n".join(lines)
+
+
+def stage_stats_report(stage_stats: pd.DataFrame) -> str:
+    """
+    Format DataProcessor.get_stage_stats as an aligned table.
+
+    Args:
+        stage_stats: DataFrame from DataProcessor.get_stage_stats
+
+    Returns:
+        One line per stage with its time and rows in and out
+    """
+
+    def rows(value) -> str:
+        return "-" if pd.isna(value) else f"{int(value):,}"
+
+    width = max([len(stage) for stage in stage_stats["stage"]] + [len("stage")])
+    lines = [f"{'stage':<{width}}  {'time':>9}  {'rows in':>12}  {'rows out':>12}"]
+    for record in stage_stats.itertuples(index=False):
+        lines.append(
+            f"{record.stage:<{width}}  {record.seconds:8.2f}s  "
+            f"{rows(record.rows_in):>12}  {rows(record.rows_out):>12}"
+        )
+    return "\n".join(lines)
+
+
+def expand_inputs(patterns: List[str]) -> List[Path]:
+    """
+    Expand input globs into a list of files.
+
+    Files keep the order of the patterns (sorted within each pattern) and
+    appear once even if several patterns match them, since the first
+    occurrence of a Transaction ID wins during deduplication.
+    """
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for match in matches:
+            path = Path(match)
+            if path.is_file() and path.resolve() not in seen:
+                seen.add(path.resolve())
+                paths.append(path)
+
+    return paths
+
+
+def write_outputs(
+    processor: DataProcessor,
+    revenue_by_file,
+    output_dir: Path,
+    output_format: str,
+) -> List[Path]:
+    """
+    Write the report tables in the requested format.
+
+    xlsx writes one workbook with a sheet per table; csv, parquet and arrow
+    write one file per table (the columnar formats add the line item /
+    transaction pairs and, when the processor kept it, the impressions table;
+    csv adds the revenue by source file).
+
+    Returns:
+        Paths of the files written
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results_df = processor.get_results_with_transaction_ids()
+
+    if output_format == "xlsx":
+        path = output_dir / f"{REPORT_NAME}.xlsx"
+        write_report_workbook(
+            path,
+            report_sheets(results_df, processor.unmatched_nxn_df, revenue_by_file),
+        )
+        return [path]
+
+    tables = {
+        REPORT_NAME: results_df,
+        "unmatched_nxn_line_items": processor.unmatched_nxn_df,
+    }
+    if output_format == "csv":
+        tables["revenue_by_source_file"] = revenue_by_file
+    else:
+        tables["lineitem_transaction_pairs"] = processor.get_lineitem_pairs()
+        tables["impressions"] = processor.get_impressions()
+
+    paths = []
+    for name, df in tables.items():
+        if df is None:
+            continue
+        if output_format == "csv":
+            path = output_dir / f"{name}.csv"
+            df.to_csv(path, index=False)
+        else:
+            path = output_dir / f"{name}{COLUMNAR_FORMATS[output_format]}"
+            write_columnar(df, path, output_format)
+        paths.append(path)
+
+    return paths
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Build the Dashboard Transactions Line Item Performance Report."
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Transaction files or glob patterns (Excel, CSV, Parquet or Arrow)",
+    )
+    parser.add_argument("--lookup", required=True, help="NXN line item lookup file")
+    parser.add_argument(
+        "--output",
+        default="reports",
+        help="Directory for the report files (default: reports)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="xlsx",
+        help="Output format (default: xlsx)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for loading and processing; 0 uses every CPU",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Fold transaction files into the aggregate chunk by chunk instead "
+        "of loading them whole (bounded memory)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help=f"Rows per chunk with --stream (default: {DEFAULT_CHUNKSIZE})",
+    )
+    parser.add_argument(
+        "--impression-fields",
+        default="",
+        help="Comma-separated impression fields (e.g. TIMESTAMP,CREATIVEID); "
+        "with parquet or arrow output, an impressions table with these fields "
+        "is exported (requires --workers 1 and no --stream)",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the report from the command line.
+
+    Args:
+        argv: Arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    workers = args.workers or None
+    impression_fields = [
+        field.strip() for field in args.impression_fields.split(",") if field.strip()
+    ]
+
+    # Only the serial columnar engine builds the impressions table
+    if impression_fields and (args.stream or args.workers != 1):
+        parser.error("--impression-fields requires --workers 1 and no --stream")
+
+    transaction_paths = expand_inputs(args.inputs)
+    if not transaction_paths:
+        print("Error: No transaction files matched the inputs", file=sys.stderr)
+        return 1
+
+    timer = StageTimer()
+    try:
+        with ExitStack() as stack:
+            files = [
+                stack.enter_context(open(path, "rb")) for path in transaction_paths
+            ]
+            lookup_file = stack.enter_context(open(args.lookup, "rb"))
+
+            with timer.stage("load lookup"):
+                nxn_lookup_df = load_nxn_lookup_file(
+                    lookup_file, columns=NXN_LOOKUP_COLUMNS
+                )
+
+            if args.stream:
+                with timer.stage("aggregate transactions"):
+                    aggregate, file_reports = aggregate_transaction_files(
+                        files, chunksize=args.chunksize
+                    )
+                processor = DataProcessor(None, nxn_lookup_df, aggregate=aggregate)
+                dedup = aggregate.dedup
+            else:
+                dedup = TransactionDeduplicator()
+                with timer.stage("load transactions"):
+                    data_df, file_reports = load_transaction_files(
+                        files,
+                        workers=workers,
+                        lean=True,
+                        dedup=dedup,
+                    )
+                processor = DataProcessor(
+                    data_df,
+                    nxn_lookup_df,
+                    workers=workers,
+                    impression_fields=impression_fields,
+                )
+
+            failed_files = [
+                report["file_name"]
+                for report in file_reports
+                if report["error"] is not None
+            ]
+            for report in file_reports:
+                if report["error"] is not None:
+                    print(
+                        f"Warning: Could not load {report['file_name']}: "
+                        f"{report['error']}",
+                        file=sys.stderr,
+                    )
+
+            if dedup.conflicts:
+                print(
+                    f"Warning: {dedup.conflicts} duplicate Transaction ID(s) had a "
+                    f"different Transaction Total than the kept row: "
+                    f"{conflict_examples_text(dedup.conflict_examples)}",
+                    file=sys.stderr,
+                )
+
+        with timer.stage("process"):
+            results_df = processor.process_transactions()
+            revenue_by_file = processor.get_revenue_by_source_file()
+        if results_df.empty:
+            print("Error: No line item data found in transactions", file=sys.stderr)
+            return 1
+
+        with timer.stage(f"export {args.format}"):
+            paths = write_outputs(
+                processor, revenue_by_file, Path(args.output), args.format
+            )
+
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    summary = processor.get_summary_stats()
+    print(
+        f"Processed {len(transaction_paths) - len(failed_files)} transaction "
+        f"file(s): "
+        f"{summary['total_lineitems']:,} line items "
+        f"({summary['matched_lineitems']:,} matched), "
+        f"{dedup.duplicates:,} duplicate Transaction ID row(s) skipped"
+    )
+    if failed_files:
+        print(
+            f"Skipped {len(failed_files)} file(s) that could not be loaded: "
+            f"{', '.join(failed_files)}"
+        )
+    for path in paths:
+        print(f"Wrote {path}")
+    print()
+    print(timer.report())
+    print()
+    print(stage_stats_report(processor.get_stage_stats()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
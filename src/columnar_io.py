@@ -0,0 +1,153 @@
+"""
+Parquet and Arrow IPC input and output.
+
+Columnar files keep their dtypes (including nullable Int64 line item IDs)
+across hand-offs between jobs, and are read without any text parsing.
+Requires pyarrow.
+"""
+
+import io
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    HAS_PYARROW = True
+except ImportError:  # optional dependency
+    HAS_PYARROW = False
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+# Export formats and their file extensions
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+COLUMNAR_MIME_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+
+def is_columnar_file(file_name: str) -> bool:
+    """Whether a file name has a Parquet or Arrow IPC extension."""
+    return file_name.lower().endswith(PARQUET_SUFFIXES + ARROW_SUFFIXES)
+
+
+def _require_pyarrow():
+    if not HAS_PYARROW:
+        raise ValueError("Parquet and Arrow files require pyarrow to be installed")
+
+
+def _select_columns(names: List[str], columns: Optional[List[str]]) -> List[str]:
+    """Keep the file's columns that are in `columns` (all of them if None)."""
+    if columns is None:
+        return list(names)
+
+    wanted = set(columns)
+    return [name for name in names if name in wanted]
+
+
+def read_columnar_file(file, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a Parquet or Arrow IPC file into a DataFrame.
+
+    Args:
+        file: File object or path with a .parquet/.pq or .arrow/.feather/.ipc
+            name
+        columns: Columns to read; columns missing from the file are ignored.
+            None reads every column.
+
+    Returns:
+        DataFrame with the dtypes stored in the file
+    """
+    _require_pyarrow()
+    file_name = getattr(file, "name", str(file)).lower()
+
+    if file_name.endswith(PARQUET_SUFFIXES):
+        parquet_file = pq.ParquetFile(file)
+        table = parquet_file.read(
+            columns=_select_columns(parquet_file.schema_arrow.names, columns)
+        )
+    else:
+        table = pa.ipc.open_file(file).read_all()
+        table = table.select(_select_columns(table.column_names, columns))
+
+    return table.to_pandas()
+
+
+def iter_columnar_chunks(
+    file, chunksize: int, columns: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a Parquet or Arrow IPC file in chunks of at most `chunksize` rows.
+
+    Parquet files are read batch by batch, so memory use is bounded by the
+    chunk size. Arrow IPC files are read record batch by record batch.
+
+    Args:
+        file: File object or path
+        chunksize: Maximum number of rows per chunk
+        columns: Columns to read (None reads every column)
+
+    Yields:
+        DataFrames with the selected columns
+    """
+    _require_pyarrow()
+    file_name = getattr(file, "name", str(file)).lower()
+
+    if file_name.endswith(PARQUET_SUFFIXES):
+        parquet_file = pq.ParquetFile(file)
+        selected = _select_columns(parquet_file.schema_arrow.names, columns)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=selected):
+            yield batch.to_pandas()
+        return
+
+    reader = pa.ipc.open_file(file)
+    selected = _select_columns(reader.schema.names, columns)
+    for index in range(reader.num_record_batches):
+        batch = reader.get_batch(index).select(selected)
+        for start in range(0, batch.num_rows, chunksize):
+            yield batch.slice(start, chunksize).to_pandas()
+
+
+def write_columnar(df: pd.DataFrame, output, fmt: str = "parquet"):
+    """
+    Write a DataFrame as Parquet or as an Arrow IPC file.
+
+    Args:
+        df: DataFrame to write (the index is not written)
+        output: Path or binary file object
+        fmt: One of COLUMNAR_FORMATS
+    """
+    _require_pyarrow()
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(
+            f"Unknown columnar format '{fmt}'. "
+            f"Expected one of: {', '.join(COLUMNAR_FORMATS)}"
+        )
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == "parquet":
+        pq.write_table(table, output)
+    else:
+        with pa.ipc.new_file(output, table.schema) as writer:
+            writer.write_table(table)
+
+
+def columnar_bytes(df: pd.DataFrame, fmt: str = "parquet") -> bytes:
+    """
+    Serialize a DataFrame to Parquet or Arrow IPC in memory.
+
+    Args:
+        df: DataFrame to write
+        fmt: One of COLUMNAR_FORMATS
+
+    Returns:
+        Content of the file
+    """
+    output = io.BytesIO()
+    write_columnar(df, output, fmt)
+    return output.getvalue()
@@ -2,26 +2,168 @@
 Core data processing logic for Dashboard Transactions Line Item Performance Report.
 """
 
+import hashlib
+import io
 import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import openpyxl
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
+
+from attribution import (
+    ATTRIBUTED_REVENUE_COLUMNS,
+    LAST_IMPRESSION_COLUMN,
+    TOUCH_POSITION_COLUMN,
+    add_attributed_roas,
+    attributed_revenue,
+)
+from aggregates import (
+    TRANSACTION_COLUMNS,
+    LineItemAggregate,
+    aggregate_transactions,
+    explode_transactions,
+)
+from columnar_io import (
+    HAS_PYARROW,
+    is_columnar_file,
+    iter_columnar_chunks,
+    read_columnar_file,
+)
+from file_cache import ParsedFileCache
+from impressions import ROW_COLUMN, extract_impressions, lineitem_touches
+from lineitem_keys import normalize_lineitem_ids
+from metrics import ROAS_COLUMN, calculate_roas, match_status, summarize_results
+from nxn_lookup import NXNLookupIndex
+from profiling import StageHook, StageProfiler
+from report_export import report_sheets, write_report_workbook
+from transaction_dedup import TransactionDeduplicator, conflict_examples_text
+from transaction_index import TransactionIndex
+
+try:
+    import python_calamine  # noqa: F401
+
+    HAS_CALAMINE = True
+except ImportError:  # optional dependency
+    HAS_CALAMINE = False
+
+# Engine used to read Excel workbooks: the Rust-backed calamine reader when
+# installed, otherwise pandas' default (openpyxl for .xlsx)
+EXCEL_ENGINE = "calamine" if HAS_CALAMINE else None
+
+# Processing engines accepted by DataProcessor:
+# - "columnar": parses the Impressions column in bulk and aggregates with
+#   vectorized groupby operations
+# - "rows": the original row-by-row implementation, kept for comparison
+PROCESSING_ENGINES = ("columnar", "rows")
+
+# Stages recorded by process_transactions (add_transactions records "ingest")
+PROCESSING_STAGES = ("parse", "aggregate", "enrich", "roas", "unmatched")
+
+# Default number of rows read at a time by the streaming loaders
+DEFAULT_CHUNKSIZE = 50_000
+
+# Default number of transaction files parsed concurrently
+DEFAULT_LOAD_WORKERS = 4
+
+# Dtype of long text columns (Impressions, text Transaction IDs) in lean
+# loads: Arrow strings keep the text in one buffer instead of a Python object
+# per row. Without pyarrow these columns stay object.
+LEAN_STRING_DTYPE = "string[pyarrow]" if HAS_PYARROW else None
+
+# Text columns with at most this ratio of distinct values to rows are stored
+# as categoricals in lean loads
+LEAN_CATEGORY_RATIO = 0.5
 
 
 class DataProcessor:
     """Processes transaction data and extracts line item performance metrics."""
 
-    def __init__(self, data_df: pd.DataFrame, nxn_lookup_df: pd.DataFrame):
+    def __init__(
+        self,
+        data_df: pd.DataFrame,
+        nxn_lookup_df: pd.DataFrame,
+        engine: str = "columnar",
+        workers: Optional[int] = 1,
+        aggregate: Optional[LineItemAggregate] = None,
+        nxn_index: Optional[NXNLookupIndex] = None,
+        stage_hooks: Optional[List[StageHook]] = None,
+        trace_memory: bool = False,
+        impression_fields: Optional[List[str]] = None,
+    ):
         """
         Initialize the data processor.
 
         Args:
             data_df: DataFrame from the DATA tab containing transaction data
             nxn_lookup_df: DataFrame from NXN LINE ITEM ID DELIVERY LOOKUP tab
+            engine: Processing engine, one of PROCESSING_ENGINES. Both engines
+                produce identical results.
+            workers: Number of worker processes for the columnar engine.
+                Values above 1 shard data_df across a process pool; None uses
+                every available CPU.
+            aggregate: Pre-built transaction aggregate (see
+                aggregate_transaction_files). When given, data_df may be None
+                and the explode/aggregate step is skipped.
+            nxn_index: Prebuilt index of nxn_lookup_df (see NXNLookupIndex);
+                built here when not given
+            stage_hooks: Callables invoked with each stage's profile record
+                (see get_stage_stats) as the stage finishes
+            trace_memory: Also record the peak memory allocated in each stage
+                (slower; see StageProfiler)
+            impression_fields: Impression fields (besides LINEITEMID) to keep
+                in an impressions table (see get_impressions). The serial
+                columnar engine then builds the table in its single parse of
+                the Impressions column; by default no table is built.
         """
+        if engine not in PROCESSING_ENGINES:
+            raise ValueError(
+                f"Unknown processing engine '{engine}'. "
+                f"Expected one of: {', '.join(PROCESSING_ENGINES)}"
+            )
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if engine == "rows" and workers > 1:
+            raise ValueError("The rows engine does not support multiple workers")
+        if data_df is None and aggregate is None:
+            raise ValueError("Either data_df or aggregate must be provided")
+
         self.data_df = data_df
-        self.nxn_lookup_df = nxn_lookup_df
+        self.set_nxn_lookup(nxn_lookup_df, nxn_index)
+        self.engine = engine
+        self.workers = workers
+        self.aggregate = aggregate
         self.results_df = None
         self.unmatched_nxn_df = None
+        self.transaction_index = None
+        self.impression_fields = impression_fields
+        self.impressions_df = None
+        self.profiler = StageProfiler(stage_hooks, trace_memory=trace_memory)
+
+    def set_nxn_lookup(
+        self, nxn_lookup_df: pd.DataFrame, nxn_index: Optional[NXNLookupIndex] = None
+    ):
+        """
+        Set the NXN lookup used by the next process_transactions call.
+
+        Args:
+            nxn_lookup_df: DataFrame from NXN LINE ITEM ID DELIVERY LOOKUP tab
+            nxn_index: Prebuilt index of nxn_lookup_df, e.g. cached across
+                analyses of the same lookup file; built here when not given
+        """
+        if nxn_index is None:
+            nxn_index = NXNLookupIndex.from_frame(nxn_lookup_df)
+
+        self.nxn_lookup_df = nxn_lookup_df
+        self.nxn_index = nxn_index
 
     def extract_lineitem_ids(self, impressions_str: str) -> List[str]:
         """
@@ -54,6 +196,84 @@ class DataProcessor:
             print(f"Error parsing impressions: {e}")
             return []
 
+    def add_transactions(
+        self, data_df: pd.DataFrame, chunksize: Optional[int] = None
+    ) -> int:
+        """
+        Fold new transaction rows into the processor's running aggregate.
+
+        The first call seeds the aggregate with the processor's own data_df
+        (which is then released). Rows whose Transaction ID has already been
+        folded in are skipped, so adding files in upload order gives the same
+        result as loading them all with load_multiple_transaction_files.
+        Call process_transactions afterwards to refresh results_df.
+
+        Args:
+            data_df: DataFrame with Transaction ID, Transaction Total and
+                Impressions, plus Source File Name when available
+            chunksize: Fold the rows in slices of at most this many rows
+                (default: all at once); recorded as one ingest stage
+
+        Returns:
+            Number of new rows folded in
+        """
+        if chunksize is None:
+            chunks = [data_df]
+        else:
+            chunks = (
+                data_df.iloc[start : start + chunksize]
+                for start in range(0, len(data_df), chunksize)
+            )
+
+        return self._ingest(chunks)
+
+    def add_transaction_file(self, file, chunksize: int = DEFAULT_CHUNKSIZE) -> int:
+        """
+        Stream one more transaction file into the running aggregate.
+
+        Only the new file is read and parsed, so the cost is proportional to
+        its size rather than to everything loaded so far.
+
+        Args:
+            file: File object from Streamlit file uploader
+            chunksize: Maximum number of rows parsed at a time
+
+        Returns:
+            Number of new rows folded in
+        """
+        return self._ingest(iter_transaction_chunks(file, chunksize=chunksize))
+
+    def _ingest(self, chunks) -> int:
+        """Fold chunks of transaction rows into the aggregate as one ingest stage."""
+        if self.aggregate is None:
+            self.aggregate = LineItemAggregate()
+            if self.data_df is not None:
+                with self.profiler.stage("ingest", len(self.data_df)) as record:
+                    record["rows_out"] = self.aggregate.add_transactions(
+                        self._transaction_columns(self.data_df)
+                    )
+                self.data_df = None
+                self.impressions_df = None
+
+        with self.profiler.stage("ingest", 0) as record:
+            record["rows_out"] = 0
+            for chunk in chunks:
+                record["rows_in"] += len(chunk)
+                record["rows_out"] += self.aggregate.add_transactions(
+                    self._transaction_columns(chunk)
+                )
+
+        return record["rows_out"]
+
+    @staticmethod
+    def _transaction_columns(data_df: pd.DataFrame) -> pd.DataFrame:
+        """Select the columns the aggregate needs from a transaction frame."""
+        columns = list(TRANSACTION_COLUMNS)
+        if "Source File Name" in data_df.columns:
+            columns.append("Source File Name")
+
+        return data_df[columns]
+
     def process_transactions(self) -> pd.DataFrame:
         """
         Process transaction data to create line item performance report.
@@ -61,6 +281,72 @@ class DataProcessor:
         Returns:
             DataFrame with aggregated metrics by LINEITEMID
         """
+        # Replace the previous run's stages; ingest records are kept
+        profiler = self.profiler
+        profiler.clear(PROCESSING_STAGES)
+
+        if self.aggregate is not None or (self.engine != "rows" and self.workers > 1):
+            aggregate = self.aggregate
+            if aggregate is None:
+                with profiler.stage("aggregate", len(self.data_df)) as record:
+                    aggregate = self._aggregate_parallel()
+                    record["rows_out"] = len(aggregate)
+            if aggregate.parse_errors:
+                print(
+                    f"Warning: Could not parse impressions for "
+                    f"{aggregate.parse_errors} transactions"
+                )
+            aggregated = aggregate.to_frame()
+            self.transaction_index = aggregate.to_transaction_index()
+        else:
+            with profiler.stage("parse", len(self.data_df)) as record:
+                if self.engine == "rows":
+                    pairs_df = self._explode_rows()
+                else:
+                    pairs_df = self._explode_columnar()
+                record["rows_out"] = len(pairs_df)
+
+            if pairs_df.empty:
+                return pd.DataFrame()
+
+            with profiler.stage("aggregate", len(pairs_df)) as record:
+                if self.engine == "rows":
+                    aggregated = self._aggregate_rows(pairs_df)
+                else:
+                    aggregated = self._aggregate_columnar(pairs_df)
+                self.transaction_index = TransactionIndex.from_pairs(
+                    pairs_df["LINEITEMID"], pairs_df["Transaction ID"].astype(str)
+                )
+                record["rows_out"] = len(aggregated)
+
+        if aggregated.empty:
+            return pd.DataFrame()
+
+        # Join with NXN lookup data
+        with profiler.stage("enrich", len(aggregated)) as record:
+            enriched_df = self._enrich_with_nxn_data(aggregated)
+            record["rows_out"] = len(enriched_df)
+
+        # Calculate Influenced ROAS
+        with profiler.stage("roas", len(enriched_df)) as record:
+            enriched_df = self._calculate_roas(enriched_df)
+            record["rows_out"] = len(enriched_df)
+
+        # Identify NXN line items that have no matching transactions
+        with profiler.stage("unmatched", len(self.nxn_index)) as record:
+            self._identify_unmatched_nxn_items(aggregated)
+            record["rows_out"] = len(self.unmatched_nxn_df)
+
+        self.results_df = enriched_df
+        return enriched_df
+
+    def _explode_rows(self) -> pd.DataFrame:
+        """
+        Expand transactions into transaction-lineitem pairs one row at a time.
+
+        Returns:
+            DataFrame with one row per (LINEITEMID, Transaction ID) pair
+        """
         # Create a list to store expanded transaction-lineitem pairs
         transaction_lineitem_pairs = []
 
@@ -70,35 +356,76 @@ class DataProcessor:
             transaction_total = row["Transaction Total"]
             impressions = row["Impressions"]
 
-            # Extract unique LINEITEMIDs for this transaction
+            # Extract unique LINEITEMIDs for this transaction, and where each
+            # one's last impression is (both in order of first appearance)
             lineitem_ids = self.extract_lineitem_ids(impressions)
+            _, last_positions = lineitem_touches(impressions)
 
             # Create a record for each unique LINEITEMID in this transaction
-            for lineitem_id in lineitem_ids:
+            for touch_position, (lineitem_id, last_position) in enumerate(
+                zip(lineitem_ids, last_positions)
+            ):
                 transaction_lineitem_pairs.append(
                     {
                         "LINEITEMID": lineitem_id,
                         "Transaction ID": transaction_id,
                         "Transaction Total": transaction_total,
+                        TOUCH_POSITION_COLUMN: touch_position,
+                        LAST_IMPRESSION_COLUMN: last_position,
                     }
                 )
 
         # Convert to DataFrame
-        pairs_df = pd.DataFrame(transaction_lineitem_pairs)
+        return pd.DataFrame(transaction_lineitem_pairs)
 
-        if pairs_df.empty:
-            return pd.DataFrame()
+    def _explode_columnar(self) -> pd.DataFrame:
+        """
+        Expand transactions into transaction-lineitem pairs in bulk.
+
+        With impression_fields set, the Impressions column is parsed once
+        into the impressions table (kept for get_impressions) and the pairs
+        are taken from it. See aggregates.explode_transactions.
+
+        Returns:
+            DataFrame with one row per (LINEITEMID, Transaction ID) pair
+        """
+        self.impressions_df = None
+        if self.impression_fields:
+            self.impressions_df, error_count = extract_impressions(
+                self.data_df["Impressions"].to_numpy(dtype=object),
+                self.impression_fields,
+            )
+            pairs_df, _ = explode_transactions(self.data_df, self.impressions_df)
+        else:
+            pairs_df, error_count = explode_transactions(self.data_df)
+        if error_count:
+            print(
+                f"Warning: Could not parse impressions for {error_count} transactions"
+            )
+
+        return pairs_df
+
+    def _aggregate_rows(self, pairs_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aggregate transaction-lineitem pairs by LINEITEMID with a dict-based agg.
+
+        Args:
+            pairs_df: DataFrame of (LINEITEMID, Transaction ID, Transaction
+                Total, Touch Position, Last Impression Position)
+
+        Returns:
+            DataFrame with aggregated metrics by LINEITEMID
+        """
+        pairs_df = pd.concat([pairs_df, attributed_revenue(pairs_df)], axis=1)
 
         # Group by LINEITEMID and aggregate
         aggregated = (
             pairs_df.groupby("LINEITEMID")
             .agg(
                 {
-                    "Transaction ID": [
-                        "count",
-                        lambda x: ", ".join(sorted(set(map(str, x)))),
-                    ],
+                    "Transaction ID": "count",
                     "Transaction Total": "sum",
+                    **dict.fromkeys(ATTRIBUTED_REVENUE_COLUMNS, "sum"),
                 }
             )
             .reset_index()
@@ -108,21 +435,63 @@ class DataProcessor:
         aggregated.columns = [
             "LINEITEMID",
             "Unique Transaction Count",
-            "Transaction IDs",
             "Total Transaction Amount",
+            *ATTRIBUTED_REVENUE_COLUMNS,
         ]
 
-        # Join with NXN lookup data
-        enriched_df = self._enrich_with_nxn_data(aggregated)
+        return aggregated
 
-        # Calculate Influenced ROAS
-        enriched_df = self._calculate_roas(enriched_df)
+    def _aggregate_columnar(self, pairs_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aggregate transaction-lineitem pairs by LINEITEMID with named aggregations.
 
-        # Identify NXN line items that have no matching transactions
-        self._identify_unmatched_nxn_items(aggregated)
+        The attributed revenue of every model is summed in the same groupby.
 
-        self.results_df = enriched_df
-        return enriched_df
+        Args:
+            pairs_df: DataFrame of (LINEITEMID, Transaction ID, Transaction
+                Total, Touch Position, Last Impression Position)
+
+        Returns:
+            DataFrame with aggregated metrics by LINEITEMID
+        """
+        pairs_df = pd.concat([pairs_df, attributed_revenue(pairs_df)], axis=1)
+        aggregated = pairs_df.groupby("LINEITEMID").agg(
+            **{
+                "Unique Transaction Count": ("Transaction ID", "count"),
+                "Total Transaction Amount": ("Transaction Total", "sum"),
+                **{column: (column, "sum") for column in ATTRIBUTED_REVENUE_COLUMNS},
+            }
+        )
+
+        return aggregated.reset_index()
+
+    def _aggregate_parallel(self) -> LineItemAggregate:
+        """
+        Aggregate transactions across a process pool.
+
+        data_df is split into contiguous shards, each worker builds a partial
+        LineItemAggregate, and the partials are merged in shard order. The
+        result matches _aggregate_columnar up to floating-point summation order.
+
+        Returns:
+            LineItemAggregate over all of data_df
+        """
+        aggregate = LineItemAggregate()
+        transactions = self.data_df[TRANSACTION_COLUMNS]
+        if transactions.empty:
+            return aggregate
+
+        shard_count = min(self.workers, len(transactions))
+        shards = [
+            transactions.iloc[positions]
+            for positions in np.array_split(np.arange(len(transactions)), shard_count)
+        ]
+
+        with ProcessPoolExecutor(max_workers=shard_count) as executor:
+            for shard_aggregate in executor.map(aggregate_transactions, shards):
+                aggregate.merge(shard_aggregate)
+
+        return aggregate
 
     def _enrich_with_nxn_data(self, aggregated_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -134,69 +503,18 @@ class DataProcessor:
         Returns:
             Enriched DataFrame with NXN data
         """
-        # Prepare NXN lookup with relevant columns (including new ones)
-        desired_columns = {
-            "line_item_id": "LINEITEMID",
-            "advertiser_name": "Advertiser Name",
-            "insertion_order_id": "Insertion Order ID",
-            "insertion_order_name": "Insertion Order Name",
-            "packag_id": "Package ID",  # Note: might be 'packag_id' or 'package_id'
-            "package_name": "Package Name",
-            "line_item_name": "NXN Line Item Name",
-            "impressions": "NXN Impressions",
-            "advertiser_invoice": "NXN Spend",
-        }
-
-        # Build list of available columns (handle both 'packag_id' and 'package_id')
-        available_columns = []
-        for col_key, col_name in desired_columns.items():
-            if col_key in self.nxn_lookup_df.columns:
-                available_columns.append((col_key, col_name))
-            elif col_key == "packag_id" and "package_id" in self.nxn_lookup_df.columns:
-                available_columns.append(("package_id", col_name))
-
-        # Select available columns from NXN lookup
-        nxn_subset = self.nxn_lookup_df[[col[0] for col in available_columns]].copy()
-        nxn_subset.columns = [col[1] for col in available_columns]
-
-        # Deduplicate NXN data by LINEITEMID (aggregate duplicate rows)
-        # Some NXN files have multiple rows per line_item_id (e.g., different beacon names)
-        agg_dict = {}
-        for col in nxn_subset.columns:
-            if col == "LINEITEMID":
-                continue
-            elif col in ["NXN Impressions", "NXN Spend"]:
-                agg_dict[col] = "sum"  # Sum numeric metrics
-            else:
-                agg_dict[col] = "first"  # Take first value for names/IDs
-
-        # Group by LINEITEMID to remove duplicates
-        nxn_subset_dedup = nxn_subset.groupby("LINEITEMID", as_index=False).agg(
-            agg_dict
-        )
-
-        # Convert LINEITEMID to string for matching (NXN has integers, impressions has strings)
-        # Use .apply() with int() first to ensure full precision, then convert to string
-        # This prevents scientific notation for large integers
-        if pd.api.types.is_numeric_dtype(nxn_subset_dedup["LINEITEMID"]):
-            nxn_subset_dedup["LINEITEMID"] = nxn_subset_dedup["LINEITEMID"].apply(
-                lambda x: str(int(x)) if pd.notna(x) else x
-            )
-        else:
-            nxn_subset_dedup["LINEITEMID"] = nxn_subset_dedup["LINEITEMID"].astype(str)
-
+        # Keep the displayed LINEITEMID as a string but join on the Int64 key
+        lineitem_keys = normalize_lineitem_ids(aggregated_df["LINEITEMID"])
         aggregated_df_copy = aggregated_df.copy()
         aggregated_df_copy["LINEITEMID"] = aggregated_df_copy["LINEITEMID"].astype(str)
 
         # Left join to keep all LINEITEMIDs from transaction data
-        enriched = aggregated_df_copy.merge(
-            nxn_subset_dedup, on="LINEITEMID", how="left"
+        enriched = pd.concat(
+            [aggregated_df_copy, self.nxn_index.join(lineitem_keys)], axis=1
         )
 
         # Flag records with no match
-        enriched["Match Status"] = enriched["NXN Line Item Name"].apply(
-            lambda x: "Matched" if pd.notna(x) else "No Match Found"
-        )
+        enriched["Match Status"] = match_status(enriched["NXN Line Item Name"])
 
         return enriched
 
@@ -204,25 +522,22 @@ class DataProcessor:
         """
         Calculate Influenced ROAS (Not Deduplicated) for each line item.
 
-        Formula: Total Transaction Amount / NXN Spend
+        Formula: Total Transaction Amount / NXN Spend. Each attribution
+        model's ROAS divides its attributed revenue by the same spend.
 
         Args:
             df: DataFrame with transaction amounts and NXN spend
 
         Returns:
-            DataFrame with ROAS column added
+            DataFrame with ROAS columns added
         """
         df = df.copy()
 
         # Calculate ROAS, handling division by zero and missing values
-        df["Influenced ROAS (Not Deduplicated)"] = df.apply(
-            lambda row: (
-                row["Total Transaction Amount"] / row["NXN Spend"]
-                if pd.notna(row["NXN Spend"]) and row["NXN Spend"] > 0
-                else None
-            ),
-            axis=1,
+        df[ROAS_COLUMN] = calculate_roas(
+            df["Total Transaction Amount"], df["NXN Spend"]
         )
+        add_attributed_roas(df)
 
         return df
 
@@ -233,84 +548,129 @@ class DataProcessor:
         Args:
             aggregated_df: DataFrame with aggregated transaction metrics by LINEITEMID
         """
-        # Get all LINEITEMIDs that appear in transactions
-        matched_lineitem_ids = set(aggregated_df["LINEITEMID"].astype(str))
+        # Anti-join on the canonical key: NXN line items whose key never
+        # appears in the transactions
+        matched_keys = normalize_lineitem_ids(aggregated_df["LINEITEMID"])
+        self.unmatched_nxn_df = self.nxn_index.unmatched(matched_keys)
+
+    def get_results_with_transaction_ids(
+        self, results_df: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """
+        Add the comma-separated Transaction IDs column for display or export.
 
-        # Get all line_item_ids from NXN lookup
-        nxn_lineitem_ids = (
-            self.nxn_lookup_df["line_item_id"]
-            .apply(lambda x: str(int(x)) if pd.notna(x) else str(x))
-            .unique()
+        Transaction IDs are kept in the compact transaction_index and only
+        turned into strings here, for just the rows passed in.
+
+        Args:
+            results_df: Subset of results_df (defaults to all of it)
+
+        Returns:
+            Copy of the frame with a Transaction IDs column after
+            Unique Transaction Count
+        """
+        if results_df is None:
+            results_df = self.results_df
+
+        results_df = results_df.copy()
+        if self.transaction_index is None or "LINEITEMID" not in results_df.columns:
+            return results_df
+
+        position = (
+            results_df.columns.get_loc("Unique Transaction Count") + 1
+            if "Unique Transaction Count" in results_df.columns
+            else len(results_df.columns)
+        )
+        results_df.insert(
+            position,
+            "Transaction IDs",
+            self.transaction_index.join(results_df["LINEITEMID"]),
         )
 
-        # Find NXN line items that don't appear in transactions
-        unmatched_ids = [
-            lid for lid in nxn_lineitem_ids if lid not in matched_lineitem_ids
-        ]
+        return results_df
 
-        # Create DataFrame for unmatched NXN items
-        if unmatched_ids:
-            # Filter NXN lookup for unmatched items
-            unmatched_mask = (
-                self.nxn_lookup_df["line_item_id"]
-                .apply(lambda x: str(int(x)) if pd.notna(x) else str(x))
-                .isin(unmatched_ids)
-            )
+    def get_lineitem_pairs(self) -> pd.DataFrame:
+        """
+        Get the distinct (LINEITEMID, Transaction ID) pairs behind the results.
 
-            # Select relevant columns - matching Line Item Performance structure
-            columns_to_include = {
-                "advertiser_name": "Advertiser Name",
-                "insertion_order_id": "Insertion Order ID",
-                "insertion_order_name": "Insertion Order Name",
-                "packag_id": "Package ID",
-                "package_name": "Package Name",
-                "line_item_id": "LINEITEMID",
-                "line_item_name": "NXN Line Item Name",
-                "impressions": "NXN Impressions",
-                "advertiser_invoice": "NXN Spend",
-            }
+        Returns:
+            DataFrame with LINEITEMID and Transaction ID string columns, one
+            row per pair, ordered by LINEITEMID then Transaction ID
+        """
+        if self.transaction_index is None:
+            return pd.DataFrame({"LINEITEMID": [], "Transaction ID": []}, dtype=object)
 
-            # Build list of available columns (handle both 'packag_id' and 'package_id')
-            available_cols_list = []
-            available_cols_mapping = {}
-            for col_key, col_name in columns_to_include.items():
-                if col_key in self.nxn_lookup_df.columns:
-                    available_cols_list.append(col_key)
-                    available_cols_mapping[col_key] = col_name
-                elif (
-                    col_key == "packag_id"
-                    and "package_id" in self.nxn_lookup_df.columns
-                ):
-                    available_cols_list.append("package_id")
-                    available_cols_mapping["package_id"] = col_name
-
-            unmatched_nxn = self.nxn_lookup_df[unmatched_mask][
-                available_cols_list
-            ].copy()
-            unmatched_nxn.columns = [
-                available_cols_mapping[col] for col in available_cols_list
-            ]
+        pairs_df = self.transaction_index.to_pairs()
+        pairs_df["LINEITEMID"] = pairs_df["LINEITEMID"].astype(str)
+        return pairs_df
+
+    def get_impressions(
+        self, transaction_id: Optional[str] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Get the impressions table parsed by the last process_transactions.
 
-            # Convert LINEITEMID to string for consistency
-            unmatched_nxn["LINEITEMID"] = unmatched_nxn["LINEITEMID"].apply(
-                lambda x: str(int(x)) if pd.notna(x) else str(x)
+        The table is only built when impression_fields is set, and only by
+        the serial columnar engine; the parallel and streaming paths keep
+        just the LINEITEMIDs of each slice.
+
+        Args:
+            transaction_id: Only return the journey of this Transaction ID
+                (compared as a string)
+
+        Returns:
+            DataFrame with Transaction ID, Impression Position, First
+            Impression, LINEITEMID and the other impression_fields (as
+            strings, so the table can be exported), one row per impression
+            in journey order, or None when no table was kept
+        """
+        if self.impressions_df is None:
+            return None
+
+        impressions_df = self.impressions_df
+        transaction_ids = self.data_df["Transaction ID"]
+        if transaction_id is not None:
+            rows = np.flatnonzero(
+                (transaction_ids.astype(str) == str(transaction_id)).to_numpy()
             )
+            impressions_df = impressions_df[
+                np.isin(impressions_df[ROW_COLUMN].to_numpy(), rows)
+            ]
 
-            # Group by LINEITEMID to handle duplicates (sum spend and impressions)
-            agg_dict = {}
-            for col in unmatched_nxn.columns:
-                if col == "LINEITEMID":
-                    continue
-                elif col in ["NXN Impressions", "NXN Spend"]:
-                    agg_dict[col] = "sum"
-                else:
-                    agg_dict[col] = "first"
+        impressions_df = impressions_df.reset_index(drop=True)
+        impressions_df.insert(
+            0,
+            "Transaction ID",
+            transaction_ids.to_numpy()[impressions_df.pop(ROW_COLUMN).to_numpy()],
+        )
+        impressions_df["LINEITEMID"] = impressions_df["LINEITEMID"].astype(str)
+        for field in impressions_df.columns[4:]:
+            impressions_df[field] = impressions_df[field].astype("string")
+        return impressions_df
 
-            self.unmatched_nxn_df = unmatched_nxn.groupby(
-                "LINEITEMID", as_index=False
-            ).agg(agg_dict)
-        else:
-            self.unmatched_nxn_df = pd.DataFrame()
+    def get_stage_stats(self) -> pd.DataFrame:
+        """
+        Get the profile of the processing stages run so far.
+
+        One row per ingest call (add_transactions / add_transaction_file)
+        and per stage of the latest process_transactions run (see
+        PROCESSING_STAGES).
+
+        Returns:
+            DataFrame with stage, seconds, rows_in, rows_out,
+            peak_traced_bytes (None unless trace_memory is set) and
+            max_rss_bytes (process peak resident memory after the stage)
+        """
+        return self.profiler.to_frame()
+
+    def add_stage_hook(self, hook: StageHook):
+        """
+        Register a callable invoked with each stage's profile record.
+
+        Args:
+            hook: Callable taking the record dict (see get_stage_stats)
+        """
+        self.profiler.add_hook(hook)
 
     def get_summary_stats(self) -> Dict:
         """
@@ -322,36 +682,7 @@ class DataProcessor:
         if self.results_df is None:
             return {}
 
-        # Calculate total NXN spend from lookup file (all line items)
-        total_nxn_spend = 0
-        if "advertiser_invoice" in self.nxn_lookup_df.columns:
-            # Group by line_item_id and sum to handle duplicates
-            nxn_grouped = self.nxn_lookup_df.groupby("line_item_id")[
-                "advertiser_invoice"
-            ].sum()
-            total_nxn_spend = nxn_grouped.sum()
-
-        return {
-            "total_lineitems": len(self.results_df),
-            "matched_lineitems": len(
-                self.results_df[self.results_df["Match Status"] == "Matched"]
-            ),
-            "unmatched_lineitems": len(
-                self.results_df[self.results_df["Match Status"] == "No Match Found"]
-            ),
-            "total_transactions": self.results_df["Unique Transaction Count"].sum(),
-            "total_revenue": self.results_df["Total Transaction Amount"].sum(),
-            "total_spend": self.results_df[
-                "NXN Spend"
-            ].sum(),  # Spend for matched line items only
-            "total_nxn_spend": total_nxn_spend,  # Total spend from entire NXN file
-            "overall_roas": (
-                self.results_df["Total Transaction Amount"].sum()
-                / self.results_df["NXN Spend"].sum()
-                if self.results_df["NXN Spend"].sum() > 0
-                else None
-            ),
-        }
+        return summarize_results(self.results_df, self.nxn_index.total_spend)
 
     def get_revenue_by_source_file(self) -> pd.DataFrame:
         """
@@ -360,15 +691,22 @@ class DataProcessor:
         Returns:
             DataFrame with source file names and their total transaction amounts
         """
+        if self.aggregate is not None:
+            return self.aggregate.source_file_frame()
+
         if "Source File Name" not in self.data_df.columns:
             return pd.DataFrame()
 
         revenue_by_file = (
-            self.data_df.groupby("Source File Name")["Transaction Total"]
+            self.data_df.groupby("Source File Name", observed=True)["Transaction Total"]
             .sum()
             .reset_index()
         )
         revenue_by_file.columns = ["Source File Name", "Total Transaction Amount"]
+        # Plain strings, also when the column was loaded as a categorical
+        revenue_by_file["Source File Name"] = revenue_by_file[
+            "Source File Name"
+        ].astype(object)
         revenue_by_file = revenue_by_file.sort_values(
             "Total Transaction Amount", ascending=False
         )
@@ -376,89 +714,643 @@ class DataProcessor:
         return revenue_by_file
 
 
-def load_transaction_file(file) -> pd.DataFrame:
+def file_digest(file) -> str:
+    """
+    Compute the SHA-256 digest of a file's content.
+
+    Args:
+        file: File object from Streamlit file uploader, or any seekable
+            binary file object
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    file.seek(0)
+    for block in iter(lambda: file.read(1024 * 1024), b""):
+        digest.update(block)
+    file.seek(0)
+
+    return digest.hexdigest()
+
+
+def _find_data_sheet(sheet_names) -> str:
+    """Pick the DATA sheet (case-insensitive), falling back to the first sheet."""
+    for sheet in sheet_names:
+        if sheet.upper() == "DATA":
+            return sheet
+
+    if len(sheet_names) > 0:
+        return sheet_names[0]
+
+    raise ValueError("No sheets found in Excel file")
+
+
+def _column_filter(columns: Optional[List[str]]):
+    """Build a usecols argument that keeps only `columns` (None keeps all)."""
+    if columns is None:
+        return None
+
+    wanted = set(columns)
+    return lambda column: column in wanted
+
+
+def _read_transaction_file(
+    file, columns: Optional[List[str]] = None, engine: Optional[str] = None
+) -> pd.DataFrame:
+    """Parse the transaction data of a single Excel or CSV file."""
+    # Check file extension
+    file_name = file.name.lower()
+    usecols = _column_filter(columns)
+
+    if file_name.endswith(".csv"):
+        # Read CSV file directly
+        return pd.read_csv(file, usecols=usecols)
+
+    if is_columnar_file(file_name):
+        # Parquet / Arrow IPC: typed columns, no text parsing
+        return read_columnar_file(file, columns=columns)
+
+    # Open the workbook once: list its sheets and parse the DATA tab from the
+    # same handle instead of reading the file a second time
+    with pd.ExcelFile(file, engine=engine or EXCEL_ENGINE) as xls:
+        # Find DATA sheet (case-insensitive), falling back to the first sheet
+        data_sheet = _find_data_sheet(xls.sheet_names)
+
+        return xls.parse(data_sheet, usecols=usecols)
+
+
+def lean_transaction_columns(columns: Optional[List[str]] = None) -> List[str]:
+    """
+    Columns read by a lean load: TRANSACTION_COLUMNS plus the extras requested.
+
+    Args:
+        columns: Extra columns to keep (e.g. for previews or filters)
+    """
+    extras = [column for column in columns or [] if column not in TRANSACTION_COLUMNS]
+    return [*TRANSACTION_COLUMNS, *extras]
+
+
+def compact_transactions(data_df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    """
+    Convert transaction data to memory-lean dtypes.
+
+    - Source File Name and other text columns with few distinct values become
+      categoricals
+    - Impressions and text Transaction IDs without missing values become
+      Arrow strings (see LEAN_STRING_DTYPE)
+    - Integer columns (e.g. numeric Transaction IDs) are downcast to the
+      smallest integer type that holds their values
+
+    Transaction Total keeps its dtype: float32 cannot hold cent amounts
+    exactly, so downcasting it would change the revenue totals.
+
+    Args:
+        data_df: Transaction DataFrame (modified in place)
+
+    Returns:
+        Tuple of (compacted DataFrame, bytes saved; 0 when the compact dtypes
+        are no smaller, e.g. for an empty file)
+    """
+    before = int(data_df.memory_usage(deep=True).sum())
+
+    for column in data_df.columns:
+        values = data_df[column]
+        if column == "Transaction Total":
+            continue
+        if pd.api.types.is_integer_dtype(values.dtype) and not isinstance(
+            values.dtype, pd.CategoricalDtype
+        ):
+            data_df[column] = pd.to_numeric(values, downcast="integer")
+        elif values.dtype == object:
+            if column == "Impressions" or (
+                column == "Transaction ID" and not values.isna().any()
+            ):
+                if LEAN_STRING_DTYPE is not None and _is_text(values):
+                    data_df[column] = values.astype(LEAN_STRING_DTYPE)
+            elif values.nunique(dropna=False) <= LEAN_CATEGORY_RATIO * len(values):
+                data_df[column] = values.astype("category")
+
+    # Categoricals and Arrow strings carry fixed overhead that can outweigh
+    # the savings on tiny frames
+    return data_df, max(0, before - int(data_df.memory_usage(deep=True).sum()))
+
+
+def _is_text(values: pd.Series) -> bool:
+    """Whether every non-missing value of an object column is a str."""
+    return all(isinstance(value, str) for value in values.dropna())
+
+
+def _cached_read(
+    file,
+    kind: str,
+    reader,
+    cache: Optional[ParsedFileCache],
+    columns: Optional[List[str]] = None,
+    engine: Optional[str] = None,
+):
+    """Parse a file with `reader`, going through the on-disk cache when given."""
+    reader = partial(reader, columns=columns, engine=engine)
+    if cache is None:
+        return reader(file)
+
+    # Pruned reads are cached separately from full ones
+    variants = []
+    if columns is not None:
+        variants.append(
+            hashlib.sha256("\0".join(sorted(columns)).encode()).hexdigest()[:16]
+        )
+
+    # Excel reads are keyed on the engine that parses them; the default one
+    # changes when calamine is installed
+    file_name = file.name.lower()
+    excel_engine = engine or EXCEL_ENGINE
+    if excel_engine and not (file_name.endswith(".csv") or is_columnar_file(file_name)):
+        variants.append(excel_engine)
+
+    key = cache.make_key(file_digest(file), kind, "-".join(variants))
+    df = cache.get(key)
+    if df is None:
+        df = reader(file)
+        cache.put(key, df)
+
+    return df
+
+
+def load_transaction_file(
+    file,
+    cache: Optional[ParsedFileCache] = None,
+    columns: Optional[List[str]] = None,
+    lean: bool = False,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
     """
     Load transaction data from a single Excel or CSV file.
 
     Args:
         file: File object from Streamlit file uploader
+        cache: Optional on-disk cache of parsed files; repeat loads of the
+            same file content skip parsing
+        columns: Columns to read (e.g. TRANSACTION_COLUMNS); others are
+            skipped while parsing. None reads every column.
+        lean: Read only TRANSACTION_COLUMNS plus the extras in `columns` and
+            store them with compact dtypes (see compact_transactions)
+        engine: pandas Excel engine for Excel files (default: calamine when
+            installed, else the pandas default)
 
     Returns:
         DataFrame with transaction data (includes 'Source File Name' column)
     """
     try:
-        # Check file extension
-        file_name = file.name.lower()
+        if lean:
+            columns = lean_transaction_columns(columns)
 
-        if file_name.endswith(".csv"):
-            # Read CSV file directly
-            data_df = pd.read_csv(file)
-        else:
-            # Read the DATA tab from Excel file (try both uppercase and lowercase)
-            xls = pd.ExcelFile(file)
-            sheet_names = xls.sheet_names
-
-            # Try to find DATA sheet (case-insensitive)
-            data_sheet = None
-            for sheet in sheet_names:
-                if sheet.upper() == "DATA":
-                    data_sheet = sheet
-                    break
-
-            if data_sheet is None:
-                # If no DATA sheet found, use first sheet
-                if len(sheet_names) > 0:
-                    data_sheet = sheet_names[0]
-                else:
-                    raise ValueError("No sheets found in Excel file")
+        data_df = _cached_read(
+            file, "transactions", _read_transaction_file, cache, columns, engine
+        )
 
-            data_df = pd.read_excel(file, sheet_name=data_sheet)
+        # Pruned reads skip absent columns silently, so check that the
+        # required ones requested were actually found
+        if columns is not None:
+            missing_columns = [
+                col
+                for col in TRANSACTION_COLUMNS
+                if col in columns and col not in data_df.columns
+            ]
+            if missing_columns:
+                raise ValueError(
+                    f"Missing required columns: {', '.join(missing_columns)}"
+                )
 
         # Add source file name column
         data_df["Source File Name"] = file.name
 
+        if lean:
+            data_df, _ = compact_transactions(data_df)
+
         return data_df
 
     except Exception as e:
         raise ValueError(f"Error loading transaction file: {str(e)}")
 
 
-def load_multiple_transaction_files(files) -> pd.DataFrame:
+def load_multiple_transaction_files(
+    files,
+    cache: Optional[ParsedFileCache] = None,
+    workers: Optional[int] = 1,
+    columns: Optional[List[str]] = None,
+    lean: bool = False,
+    dedup: Optional[TransactionDeduplicator] = None,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
     """
     Load and combine transaction data from multiple Excel files.
 
     Args:
         files: List of file objects from Streamlit file uploader
+        cache: Optional on-disk cache of parsed files
+        workers: Number of files parsed concurrently (see
+            load_transaction_files)
+        columns: Columns to read from each file (None reads every column)
+        lean: Load with compact dtypes (see load_transaction_file)
+        dedup: Transaction ID deduplicator (see load_transaction_files)
+        engine: pandas Excel engine for Excel files (see
+            load_transaction_file)
 
     Returns:
         Combined DataFrame with all transaction data
     """
-    all_data = []
+    if dedup is None:
+        dedup = TransactionDeduplicator()
+
+    combined_df, file_reports = load_transaction_files(
+        files,
+        cache=cache,
+        workers=workers,
+        columns=columns,
+        lean=lean,
+        dedup=dedup,
+        engine=engine,
+    )
+
+    for report in file_reports:
+        if report["error"] is not None:
+            print(f"Warning: Could not load {report['file_name']}: {report['error']}")
+
+    if dedup.conflicts:
+        print(
+            f"Warning: {dedup.conflicts} duplicate Transaction ID(s) had a different "
+            f"Transaction Total than the kept row: "
+            f"{conflict_examples_text(dedup.conflict_examples)}"
+        )
 
-    for file in files:
-        try:
-            data_df = load_transaction_file(file)
+    return combined_df
+
+
+def load_transaction_files(
+    files,
+    cache: Optional[ParsedFileCache] = None,
+    workers: Optional[int] = DEFAULT_LOAD_WORKERS,
+    columns: Optional[List[str]] = None,
+    lean: bool = False,
+    dedup: Optional[TransactionDeduplicator] = None,
+    engine: Optional[str] = None,
+) -> tuple[pd.DataFrame, List[Dict]]:
+    """
+    Load transaction files concurrently and report on each one.
+
+    Files are parsed in a pool of worker processes (openpyxl parsing is pure
+    Python, so threads would not run in parallel). Each file is deduplicated
+    on Transaction ID against the files before it in upload order (first
+    occurrence wins) as soon as it is parsed, and its raw frame is dropped,
+    so at most `workers` raw frames are held at once and duplicate rows are
+    never concatenated.
+
+    Args:
+        files: List of file objects from Streamlit file uploader
+        cache: Optional on-disk cache of parsed files
+        workers: Maximum number of files parsed at once; 1 parses them one
+            after another in this process, None uses every available CPU
+        columns: Columns to read from each file (None reads every column)
+        lean: Load with compact dtypes (see load_transaction_file)
+        dedup: Transaction ID deduplicator to check the files against, e.g.
+            to read its summary() or conflict_frame() afterwards; a new one
+            is used when not given
+        engine: pandas Excel engine for Excel files (see
+            load_transaction_file)
+
+    Returns:
+        Tuple of (combined DataFrame with all transaction data, list of
+        per-file dicts with file_name, rows, seconds, memory_bytes,
+        memory_saved_bytes (by lean dtypes; 0 without lean), duplicates
+        (rows dropped as already seen), conflicts (dropped rows whose
+        Transaction Total differs from the kept row) and error, in upload
+        order; error is None for files that loaded)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    workers = min(workers, len(files))
+
+    if dedup is None:
+        dedup = TransactionDeduplicator()
+
+    all_data = []
+    file_reports = []
+    for data_df, report in _iter_loaded_files(
+        files, cache, columns, lean, workers, engine
+    ):
+        duplicates, conflicts = dedup.duplicates, dedup.conflicts
+        if data_df is not None:
+            # Remove rows whose Transaction ID an earlier row already has
+            if "Transaction ID" in data_df.columns:
+                totals = data_df.get("Transaction Total")
+                data_df = data_df[
+                    dedup.first_occurrence_mask(
+                        data_df["Transaction ID"], totals, report["file_name"]
+                    )
+                ]
             all_data.append(data_df)
-        except Exception as e:
-            print(f"Warning: Could not load {file.name}: {str(e)}")
-            continue
+        report["duplicates"] = dedup.duplicates - duplicates
+        report["conflicts"] = dedup.conflicts - conflicts
+        file_reports.append(report)
 
     if not all_data:
         raise ValueError("No transaction files could be loaded successfully")
 
-    # Combine all dataframes
+    # Combine the deduplicated dataframes
     combined_df = pd.concat(all_data, ignore_index=True)
 
-    # Remove duplicates based on Transaction ID if present
-    if "Transaction ID" in combined_df.columns:
-        combined_df = combined_df.drop_duplicates(
-            subset=["Transaction ID"], keep="first"
-        )
+    if lean:
+        # Categoricals with different categories concatenate to object
+        combined_df, _ = compact_transactions(combined_df)
 
-    return combined_df
+    return combined_df, file_reports
 
 
-def load_nxn_lookup_file(file) -> pd.DataFrame:
+def _iter_loaded_files(
+    files,
+    cache: Optional[ParsedFileCache],
+    columns: Optional[List[str]],
+    lean: bool,
+    workers: int,
+    engine: Optional[str] = None,
+) -> Iterator[tuple[Optional[pd.DataFrame], Dict]]:
+    """
+    Load files in upload order, yielding each (DataFrame or None, report).
+
+    With several workers, at most `workers` files are submitted ahead of the
+    one being yielded, so parsed frames do not pile up while earlier files
+    are consumed.
+    """
+    if workers <= 1:
+        for file in files:
+            yield _load_transaction_file_timed(file, cache, columns, lean, engine)
+        return
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file in files:
+            # Send the raw bytes: upload objects themselves may not be picklable
+            pending.append(
+                executor.submit(
+                    _load_transaction_file_timed,
+                    _named_buffer(file),
+                    cache,
+                    columns,
+                    lean,
+                    engine,
+                )
+            )
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def _load_transaction_file_timed(
+    file,
+    cache: Optional[ParsedFileCache],
+    columns: Optional[List[str]] = None,
+    lean: bool = False,
+    engine: Optional[str] = None,
+) -> tuple[Optional[pd.DataFrame], Dict]:
+    """Load one file, returning (DataFrame or None, per-file report)."""
+    start = time.perf_counter()
+    data_df, error = None, None
+    memory_bytes, memory_saved_bytes = 0, 0
+    try:
+        if lean:
+            data_df = load_transaction_file(
+                file,
+                cache=cache,
+                columns=lean_transaction_columns(columns),
+                engine=engine,
+            )
+            data_df, memory_saved_bytes = compact_transactions(data_df)
+        else:
+            data_df = load_transaction_file(
+                file, cache=cache, columns=columns, engine=engine
+            )
+        memory_bytes = int(data_df.memory_usage(deep=True).sum())
+    except Exception as e:
+        error = str(e)
+
+    return data_df, {
+        "file_name": file.name,
+        "rows": len(data_df) if data_df is not None else 0,
+        "seconds": time.perf_counter() - start,
+        "memory_bytes": memory_bytes,
+        "memory_saved_bytes": memory_saved_bytes,
+        "error": error,
+    }
+
+
+def _named_buffer(file) -> io.BytesIO:
+    """Copy an uploaded file into a picklable in-memory buffer with its name."""
+    file.seek(0)
+    buffer = io.BytesIO(file.read())
+    buffer.name = file.name
+    file.seek(0)
+    return buffer
+
+
+def iter_transaction_chunks(
+    file, chunksize: int = DEFAULT_CHUNKSIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a transaction file in chunks of at most `chunksize` rows.
+
+    Only the columns needed for processing are read. CSV files are read with
+    the pandas chunked reader, .xlsx files with openpyxl's read-only mode and
+    Parquet/Arrow files batch by batch, so memory use is bounded by the chunk
+    size rather than the file size.
+    Other formats are loaded whole and then sliced.
+
+    Args:
+        file: File object from Streamlit file uploader (or any object with a
+            name attribute that pandas can read)
+        chunksize: Maximum number of rows per chunk
+
+    Yields:
+        DataFrames with Transaction ID, Transaction Total, Impressions and
+        Source File Name columns
+    """
+    try:
+        file_name = file.name.lower()
+
+        if file_name.endswith(".csv"):
+            chunks = pd.read_csv(file, usecols=TRANSACTION_COLUMNS, chunksize=chunksize)
+        elif file_name.endswith((".xlsx", ".xlsm")):
+            chunks = _iter_excel_chunks(file, chunksize)
+        elif is_columnar_file(file_name):
+            chunks = iter_columnar_chunks(file, chunksize, columns=TRANSACTION_COLUMNS)
+        else:
+            data_df = load_transaction_file(file, columns=TRANSACTION_COLUMNS)[
+                TRANSACTION_COLUMNS
+            ]
+            chunks = (
+                data_df.iloc[start : start + chunksize]
+                for start in range(0, len(data_df), chunksize)
+            )
+
+        for chunk in chunks:
+            chunk = chunk[TRANSACTION_COLUMNS].copy()
+            chunk["Source File Name"] = file.name
+            yield chunk
+
+    except Exception as e:
+        raise ValueError(f"Error loading transaction file: {str(e)}")
+
+
+def _iter_excel_chunks(file, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Stream the DATA sheet of an .xlsx workbook in row chunks."""
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[_find_data_sheet(workbook.sheetnames)]
+        rows = worksheet.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        header = list(header)
+
+        missing_columns = [col for col in TRANSACTION_COLUMNS if col not in header]
+        if missing_columns:
+            raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+        positions = [header.index(col) for col in TRANSACTION_COLUMNS]
+
+        buffer = []
+        for row in rows:
+            values = [
+                row[position] if position < len(row) else None for position in positions
+            ]
+            if all(value is None for value in values):
+                continue
+            buffer.append(values)
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=TRANSACTION_COLUMNS)
+                buffer = []
+
+        if buffer:
+            yield pd.DataFrame(buffer, columns=TRANSACTION_COLUMNS)
+    finally:
+        workbook.close()
+
+
+def aggregate_transaction_files(
+    files, chunksize: int = DEFAULT_CHUNKSIZE
+) -> tuple[LineItemAggregate, List[Dict]]:
+    """
+    Stream transaction files into a LineItemAggregate without concatenating them.
+
+    Each chunk is deduplicated against every Transaction ID seen so far
+    (first occurrence wins, as in load_multiple_transaction_files), parsed,
+    folded into the aggregate and then discarded, so the raw Impressions text
+    of at most one chunk is held in memory at a time.
+
+    Args:
+        files: List of file objects from Streamlit file uploader
+        chunksize: Maximum number of rows parsed at a time
+
+    Returns:
+        Tuple of (LineItemAggregate over all files, for use with
+        DataProcessor(None, nxn_lookup_df, aggregate=...), list of per-file
+        dicts with file_name, rows (rows read) and error, in upload order;
+        error is None for files that loaded). Rows folded in before a file
+        failed stay in the aggregate.
+    """
+    aggregate = LineItemAggregate()
+    file_reports = []
+
+    for file in files:
+        rows, error = 0, None
+        try:
+            for chunk in iter_transaction_chunks(file, chunksize=chunksize):
+                aggregate.add_transactions(chunk)
+                rows += len(chunk)
+        except Exception as e:
+            error = str(e)
+        file_reports.append({"file_name": file.name, "rows": rows, "error": error})
+
+    if all(report["error"] is not None for report in file_reports):
+        raise ValueError("No transaction files could be loaded successfully")
+
+    return aggregate, file_reports
+
+
+def _read_nxn_lookup_file(
+    file, columns: Optional[List[str]] = None, engine: Optional[str] = None
+) -> pd.DataFrame:
+    """Parse the NXN lookup data of an Excel or CSV file."""
+    # Check file extension
+    file_name = file.name.lower()
+    usecols = _column_filter(columns)
+
+    if file_name.endswith(".csv"):
+        # Read CSV file directly
+        # Specify dtype for line_item_id to preserve full precision of large integers
+        nxn_lookup_df = pd.read_csv(
+            file,
+            usecols=usecols,
+            dtype={"line_item_id": "Int64"},  # Use Int64 to preserve full precision
+        )
+    elif is_columnar_file(file_name):
+        # Parquet / Arrow IPC keep their dtypes; only make sure line_item_id
+        # is Int64 like the other formats
+        nxn_lookup_df = read_columnar_file(file, columns=columns)
+        if "line_item_id" in nxn_lookup_df.columns:
+            nxn_lookup_df["line_item_id"] = nxn_lookup_df["line_item_id"].astype(
+                "Int64"
+            )
+    else:
+        # Excel file - open once and parse the chosen sheet from the same handle
+        with pd.ExcelFile(file, engine=engine or EXCEL_ENGINE) as xls:
+            nxn_lookup_df = _parse_nxn_lookup_sheet(xls, usecols)
+
+    return nxn_lookup_df
+
+
+def _parse_nxn_lookup_sheet(xls: pd.ExcelFile, usecols) -> pd.DataFrame:
+    """Pick the lookup sheet of an open workbook and parse it."""
+    sheet_names = xls.sheet_names
+
+    # Try different sheet names in order of preference
+    sheet_name = None
+
+    # First, try NXN format sheets
+    if "NXN LINE ITEM ID DELIVERY LOOKUP" in sheet_names:
+        sheet_name = "NXN LINE ITEM ID DELIVERY LOOKUP"
+    elif "NXN LINE ITEM ID DELIVERY LOOKU" in sheet_names:
+        # Excel sometimes truncates sheet names to 31 characters
+        sheet_name = "NXN LINE ITEM ID DELIVERY LOOKU"
+    # Then try Programmatic sheet (Green Soul format)
+    elif "Programmatic" in sheet_names:
+        sheet_name = "Programmatic"
+    # Finally, try the first sheet if nothing else matches
+    elif len(sheet_names) > 0:
+        sheet_name = sheet_names[0]
+    else:
+        raise ValueError("No valid sheets found in file")
+
+    # Read the lookup data - header is on row 2 (index 1), skip the first row
+    # Specify dtype for line_item_id to preserve full precision of large integers
+    return xls.parse(
+        sheet_name,
+        header=1,
+        usecols=usecols,
+        dtype={"line_item_id": "Int64"},  # Use Int64 to preserve full precision
+    )
+
+
+def load_nxn_lookup_file(
+    file,
+    cache: Optional[ParsedFileCache] = None,
+    columns: Optional[List[str]] = None,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
     """
     Load NXN lookup data from Excel or CSV file.
 
@@ -471,52 +1363,20 @@ def load_nxn_lookup_file(file) -> pd.DataFrame:
 
     Args:
         file: File object from Streamlit file uploader
+        cache: Optional on-disk cache of parsed files; repeat loads of the
+            same file content skip parsing
+        columns: Columns to read (e.g. NXN_LOOKUP_COLUMNS); others are
+            skipped while parsing. None reads every column.
+        engine: pandas Excel engine for Excel files (default: calamine when
+            installed, else the pandas default)
 
     Returns:
         DataFrame with NXN lookup data
     """
     try:
-        # Check file extension
-        file_name = file.name.lower()
-
-        if file_name.endswith(".csv"):
-            # Read CSV file directly
-            # Specify dtype for line_item_id to preserve full precision of large integers
-            nxn_lookup_df = pd.read_csv(
-                file,
-                dtype={"line_item_id": "Int64"},  # Use Int64 to preserve full precision
-            )
-        else:
-            # Excel file - get sheet names
-            xls = pd.ExcelFile(file)
-            sheet_names = xls.sheet_names
-
-            # Try different sheet names in order of preference
-            sheet_name = None
-
-            # First, try NXN format sheets
-            if "NXN LINE ITEM ID DELIVERY LOOKUP" in sheet_names:
-                sheet_name = "NXN LINE ITEM ID DELIVERY LOOKUP"
-            elif "NXN LINE ITEM ID DELIVERY LOOKU" in sheet_names:
-                # Excel sometimes truncates sheet names to 31 characters
-                sheet_name = "NXN LINE ITEM ID DELIVERY LOOKU"
-            # Then try Programmatic sheet (Green Soul format)
-            elif "Programmatic" in sheet_names:
-                sheet_name = "Programmatic"
-            # Finally, try the first sheet if nothing else matches
-            elif len(sheet_names) > 0:
-                sheet_name = sheet_names[0]
-            else:
-                raise ValueError("No valid sheets found in file")
-
-            # Read the lookup data - header is on row 2 (index 1), skip the first row
-            # Specify dtype for line_item_id to preserve full precision of large integers
-            nxn_lookup_df = pd.read_excel(
-                file,
-                sheet_name=sheet_name,
-                header=1,
-                dtype={"line_item_id": "Int64"},  # Use Int64 to preserve full precision
-            )
+        nxn_lookup_df = _cached_read(
+            file, "nxn_lookup", _read_nxn_lookup_file, cache, columns, engine
+        )
 
         # Verify required columns exist
         required_columns = [
@@ -541,17 +1401,24 @@ def load_nxn_lookup_file(file) -> pd.DataFrame:
         raise ValueError(f"Error loading NXN lookup file: {str(e)}")
 
 
-def export_to_excel(results_df: pd.DataFrame, output_path: str):
+def export_to_excel(
+    results_df: pd.DataFrame,
+    output_path: str,
+    unmatched_nxn_df: Optional[pd.DataFrame] = None,
+    revenue_by_file: Optional[pd.DataFrame] = None,
+):
     """
     Export results DataFrame to Excel file.
 
+    The workbook is streamed to disk (see report_export), with the unmatched
+    NXN items and revenue by source file as extra sheets when given.
+
     Args:
         results_df: DataFrame with analysis results
         output_path: Path to save the Excel file
+        unmatched_nxn_df: Optional NXN line items with no matching transactions
+        revenue_by_file: Optional total transaction amount by source file
     """
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-        results_df.to_excel(
-            writer,
-            sheet_name="Dashboard Transactions Line Item Performance Report",
-            index=False,
-        )
+    write_report_workbook(
+        output_path, report_sheets(results_df, unmatched_nxn_df, revenue_by_file)
+    )
@@ -0,0 +1,162 @@
+"""
+Content-addressed on-disk cache of parsed input files.
+
+Parsed DataFrames are stored under the SHA-256 digest of the uploaded file's
+content, so re-uploading the same workbook skips Excel parsing entirely.
+Entries are written as Parquet when pyarrow is installed (pickle otherwise)
+and evicted least-recently-used first once the cache exceeds its size limit.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:  # optional dependency
+    HAS_PYARROW = False
+
+# Bump when a loader changes what it returns for the same file content
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get(
+        "LINEITEM_ANALYZER_CACHE_DIR",
+        Path.home() / ".cache" / "excel-lineitem-analyzer",
+    )
+)
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+CACHE_SUFFIXES = (".parquet", ".pkl")
+
+
+class ParsedFileCache:
+    """Size-bounded LRU cache of parsed DataFrames keyed by file content."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[os.PathLike] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache entries (created if missing)
+            max_bytes: Total size above which least-recently-used entries are
+                evicted
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(digest: str, kind: str, variant: str = "") -> str:
+        """
+        Build a cache key.
+
+        Args:
+            digest: Content digest of the source file (see file_digest)
+            kind: Which loader parsed the file, e.g. "transactions"
+            variant: Loader options that change the parsed result
+
+        Returns:
+            Cache key usable as a file name stem
+        """
+        parts = [digest, kind, f"v{CACHE_VERSION}"]
+        if variant:
+            parts.append(variant)
+        return "-".join(parts)
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Look up a parsed DataFrame.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            The cached DataFrame, or None on a miss
+        """
+        for path in self._paths(key):
+            try:
+                if path.suffix == ".parquet":
+                    df = pd.read_parquet(path)
+                else:
+                    df = pd.read_pickle(path)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"Warning: Discarding unreadable cache entry {path.name}: {e}")
+                path.unlink(missing_ok=True)
+                continue
+
+            # Mark as recently used for LRU eviction
+            os.utime(path)
+            return df
+
+        return None
+
+    def put(self, key: str, df: pd.DataFrame):
+        """
+        Store a parsed DataFrame and evict old entries if over the size limit.
+
+        Args:
+            key: Cache key from make_key
+            df: DataFrame to store
+        """
+        parquet_path, pickle_path = self._paths(key)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+
+        try:
+            path = pickle_path
+            if HAS_PYARROW:
+                try:
+                    df.to_parquet(tmp_name, index=False)
+                    path = parquet_path
+                except Exception:
+                    # Mixed-type object columns cannot be written as Parquet
+                    pass
+            if path == pickle_path:
+                df.to_pickle(tmp_name)
+            os.replace(tmp_name, path)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+        self._evict()
+
+    def clear(self):
+        """Remove every cache entry."""
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def _paths(self, key: str) -> list[Path]:
+        return [self.cache_dir / f"{key}{suffix}" for suffix in CACHE_SUFFIXES]
+
+    def _entries(self) -> list[Path]:
+        return [
+            path for path in self.cache_dir.iterdir() if path.suffix in CACHE_SUFFIXES
+        ]
+
+    def _evict(self):
+        """Delete least-recently-used entries until the cache fits max_bytes."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
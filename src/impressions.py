@@ -0,0 +1,251 @@
+"""
+Fast LINEITEMID extraction from Impressions JSON strings.
+
+Uses orjson when it is installed and falls back to the standard library json
+module otherwise. Results match DataProcessor.extract_lineitem_ids.
+
+extract_impressions parses an Impressions column once into a columnar
+impressions table with any number of impression fields, so reports that need
+more than the LINEITEMIDs (positions, timestamps, creatives) read the table
+instead of parsing the JSON again.
+"""
+
+import json
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+# Impression fields extracted by default; LINEITEMID is always extracted
+IMPRESSION_FIELDS = ("LINEITEMID",)
+
+# Impressions table columns besides the extracted fields
+ROW_COLUMN = "Transaction Row"
+POSITION_COLUMN = "Impression Position"
+FIRST_IMPRESSION_COLUMN = "First Impression"
+
+
+def _unique_lineitem_ids(impressions) -> list:
+    """Collect unique LINEITEMIDs from parsed impressions, preserving order."""
+    lineitem_ids = []
+    seen = set()
+    for impression in impressions:
+        if isinstance(impression, dict):
+            lineitem_id = impression.get("LINEITEMID")
+            if lineitem_id and lineitem_id not in seen:
+                seen.add(lineitem_id)
+                lineitem_ids.append(lineitem_id)
+
+    return lineitem_ids
+
+
+def _extract_lineitem_ids(impressions_str):
+    """Return unique LINEITEMIDs, or None when the value cannot be parsed."""
+    try:
+        if pd.isna(impressions_str) or impressions_str == "":
+            return []
+
+        # orjson is stricter than the standard library (no NaN literals) and
+        # turns integers beyond 64 bits into floats, so rejected documents and
+        # float IDs are re-parsed with json.loads to match the original parser
+        if orjson is not None and isinstance(impressions_str, str):
+            try:
+                lineitem_ids = _unique_lineitem_ids(orjson.loads(impressions_str))
+                if not any(isinstance(value, float) for value in lineitem_ids):
+                    return lineitem_ids
+            except orjson.JSONDecodeError:
+                pass
+
+        return _unique_lineitem_ids(json.loads(impressions_str))
+
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def extract_lineitem_ids_fast(impressions_str) -> list:
+    """
+    Extract unique LINEITEMID values from an Impressions JSON string.
+
+    Unlike DataProcessor.extract_lineitem_ids this deduplicates with a set
+    (linear instead of quadratic in journey length) and does not print
+    parse errors; malformed values simply yield an empty list.
+
+    Args:
+        impressions_str: JSON string containing array of impression objects
+
+    Returns:
+        List of unique LINEITEMID values in order of first appearance
+    """
+    return _extract_lineitem_ids(impressions_str) or []
+
+
+def _lineitem_touches(journey) -> tuple[list, list]:
+    """Collect unique LINEITEMIDs of a parsed journey with their last positions."""
+    # Re-assigning a key keeps its place, so the keys stay in order of first
+    # appearance while the values end up at each last impression
+    last_positions = {}
+    for position, impression in enumerate(journey):
+        if isinstance(impression, dict):
+            lineitem_id = impression.get("LINEITEMID")
+            if lineitem_id:
+                last_positions[lineitem_id] = position
+
+    return list(last_positions), list(last_positions.values())
+
+
+def lineitem_touches(impressions_str) -> tuple[list, list]:
+    """
+    Extract the touches of one Impressions JSON string.
+
+    Args:
+        impressions_str: JSON string containing array of impression objects
+
+    Returns:
+        Tuple of (unique LINEITEMIDs in order of first appearance, position
+        of each one's last impression in the journey); both are empty when
+        the value cannot be parsed
+    """
+    try:
+        return _lineitem_touches(_load_journey(impressions_str))
+    except (json.JSONDecodeError, TypeError):
+        return [], []
+
+
+def extract_lineitem_touches(values) -> tuple[list, list, int]:
+    """
+    Extract the touches of a whole Impressions column.
+
+    Args:
+        values: Iterable of Impressions JSON strings
+
+    Returns:
+        Tuple of (list of LINEITEMID lists, in order of first appearance;
+        list of the matching last impression position lists; number of
+        values that could not be parsed)
+    """
+    lineitem_lists = []
+    position_lists = []
+    error_count = 0
+    for value in values:
+        try:
+            lineitem_ids, last_positions = _lineitem_touches(_load_journey(value))
+        except (json.JSONDecodeError, TypeError):
+            error_count += 1
+            lineitem_ids, last_positions = [], []
+        lineitem_lists.append(lineitem_ids)
+        position_lists.append(last_positions)
+
+    return lineitem_lists, position_lists, error_count
+
+
+def _load_journey(impressions_str):
+    """Parse an Impressions value into its impression list ([] when empty)."""
+    if pd.isna(impressions_str) or impressions_str == "":
+        return []
+
+    # As in _extract_lineitem_ids, documents orjson rejects or reads float
+    # LINEITEMIDs from are parsed again with json.loads
+    if orjson is not None and isinstance(impressions_str, str):
+        try:
+            journey = orjson.loads(impressions_str)
+            if not any(
+                isinstance(impression, dict)
+                and isinstance(impression.get("LINEITEMID"), float)
+                for impression in journey
+            ):
+                return journey
+        except orjson.JSONDecodeError:
+            pass
+
+    return json.loads(impressions_str)
+
+
+def extract_impressions(
+    values: Iterable, fields: Optional[Iterable[str]] = None
+) -> tuple[pd.DataFrame, int]:
+    """
+    Parse a whole Impressions column into a columnar impressions table.
+
+    Each value is parsed once and every requested field is read from each
+    impression in the same pass. Only impressions with a LINEITEMID are kept,
+    as in extract_lineitem_touches; taking the First Impression rows gives
+    the same LINEITEMID lists.
+
+    Args:
+        values: Iterable of Impressions JSON strings
+        fields: Impression fields to extract as columns (default:
+            IMPRESSION_FIELDS); LINEITEMID is always included and missing
+            fields are None
+
+    Returns:
+        Tuple of (DataFrame with one row per impression, in journey order,
+        with Transaction Row (position of the value in `values`), Impression
+        Position (index in the journey), First Impression (first impression
+        of its LINEITEMID in the journey) and the field columns; number of
+        values that could not be parsed)
+    """
+    fields = list(dict.fromkeys(["LINEITEMID", *(fields or IMPRESSION_FIELDS)]))
+    extra_fields = fields[1:]
+
+    lengths = []
+    positions = []
+    first_flags = []
+    field_values = {field: [] for field in fields}
+    extra_values = [(field, field_values[field]) for field in extra_fields]
+
+    # LINEITEMID strings repeat across journeys, so one object is kept per
+    # value (other types are kept as parsed: 1, 1.0 and True are equal keys)
+    intern = {}.setdefault
+    add_position = positions.append
+    add_first = first_flags.append
+    add_lineitem = field_values["LINEITEMID"].append
+    error_count = 0
+
+    for value in values:
+        start = len(positions)
+        try:
+            seen = set()
+            for position, impression in enumerate(_load_journey(value)):
+                if isinstance(impression, dict):
+                    lineitem_id = impression.get("LINEITEMID")
+                    if lineitem_id:
+                        if lineitem_id in seen:
+                            add_first(False)
+                        else:
+                            seen.add(lineitem_id)
+                            add_first(True)
+                        add_position(position)
+                        if type(lineitem_id) is str:
+                            lineitem_id = intern(lineitem_id, lineitem_id)
+                        add_lineitem(lineitem_id)
+                        for field, column in extra_values:
+                            column.append(impression.get(field))
+        except (json.JSONDecodeError, TypeError):
+            # Drop the impressions already read from the malformed value
+            for column in (positions, first_flags, *field_values.values()):
+                del column[start:]
+            error_count += 1
+            lengths.append(0)
+            continue
+
+        lengths.append(len(positions) - start)
+
+    lengths = np.asarray(lengths, dtype=np.int64)
+    table = {
+        ROW_COLUMN: np.repeat(np.arange(len(lengths), dtype=np.int64), lengths),
+        POSITION_COLUMN: np.asarray(positions, dtype=np.int32),
+        FIRST_IMPRESSION_COLUMN: np.asarray(first_flags, dtype=bool),
+    }
+    for field in fields:
+        column = np.empty(len(field_values[field]), dtype=object)
+        column[:] = field_values[field]
+        table[field] = column
+
+    return pd.DataFrame(table), error_count
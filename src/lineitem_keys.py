@@ -0,0 +1,65 @@
+"""
+Canonical LINEITEMID keys.
+
+Impression journeys carry LINEITEMID as strings (sometimes numbers) while the
+NXN lookup stores line_item_id as integers. Both sides are normalized once to
+a nullable Int64 key so joins and anti-joins compare integers instead of
+Python strings.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Largest value that fits in int64, as a 19-digit string
+_INT64_MAX_DIGITS = str(2**63 - 1)
+
+
+def normalize_lineitem_ids(values) -> pd.Series:
+    """
+    Map LINEITEMID values to canonical Int64 keys.
+
+    Integers are kept as is, integral floats and digit strings (optionally
+    with surrounding whitespace, leading zeros or a trailing ".0") are
+    converted, and anything else becomes <NA>.
+
+    Args:
+        values: Series or array-like of LINEITEMID values
+
+    Returns:
+        Series of dtype Int64 aligned with values
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return pd.Series(pd.NA, index=series.index, dtype="Int64")
+
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return series.astype("Int64")
+
+    if pd.api.types.is_float_dtype(series.dtype):
+        floats = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(floats) & (floats % 1 == 0) & (np.abs(floats) < 2**63)
+        return _int64_keys(floats[valid].astype(np.int64), valid, series.index)
+
+    text = series.astype("string").str.strip().str.replace(r"\.0+$", "", regex=True)
+
+    # Drop leading zeros, keeping a single "0" for all-zero values
+    stripped = text.str.lstrip("0")
+    text = stripped.mask(((stripped == "") & (text != "")).fillna(False), "0")
+
+    digits = text.str.fullmatch(r"\d{1,19}").fillna(False)
+    valid = (
+        (digits & ((text.str.len() < 19) | (text <= _INT64_MAX_DIGITS)))
+        .fillna(False)
+        .to_numpy(dtype=bool)
+    )
+    parsed = text.to_numpy(dtype=object)[valid].astype(np.int64)
+
+    return _int64_keys(parsed, valid, series.index)
+
+
+def _int64_keys(parsed: np.ndarray, valid: np.ndarray, index) -> pd.Series:
+    """Build an Int64 series holding `parsed` where valid and <NA> elsewhere."""
+    values = np.zeros(len(valid), dtype=np.int64)
+    values[valid] = parsed
+    return pd.Series(pd.arrays.IntegerArray(values, ~valid), index=index)
@@ -0,0 +1,95 @@
+"""
+Vectorized line item metrics.
+
+ROAS, match flags and the summary figures are derived with whole-column
+operations on the results frame instead of per-row Python callbacks.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+MATCHED = "Matched"
+NO_MATCH = "No Match Found"
+
+ROAS_COLUMN = "Influenced ROAS (Not Deduplicated)"
+
+
+def calculate_roas(revenue, spend) -> np.ndarray:
+    """
+    Divide revenue by spend element-wise.
+
+    Args:
+        revenue: Series or array of Total Transaction Amount values
+        spend: Series or array of NXN Spend values
+
+    Returns:
+        Float array of revenue / spend, NaN where spend is missing or not
+        positive
+    """
+    revenue = np.asarray(revenue, dtype=np.float64)
+    spend = np.asarray(spend, dtype=np.float64)
+
+    # NaN spend compares False, so missing spend is excluded as well
+    has_spend = spend > 0
+    roas = np.full(len(spend), np.nan)
+    np.divide(revenue, spend, out=roas, where=has_spend)
+    return roas
+
+
+def match_status(nxn_names: pd.Series) -> pd.Series:
+    """
+    Label each row Matched or No Match Found.
+
+    Args:
+        nxn_names: NXN Line Item Name column after the lookup join
+
+    Returns:
+        Series of match labels aligned with nxn_names
+    """
+    return pd.Series(
+        np.where(nxn_names.notna().to_numpy(), MATCHED, NO_MATCH),
+        index=nxn_names.index,
+        dtype=object,
+    )
+
+
+def overall_roas(revenue: float, spend: float) -> Optional[float]:
+    """Revenue / spend for totals, or None when there is no positive spend."""
+    return revenue / spend if spend > 0 else None
+
+
+def summarize_results(results_df: pd.DataFrame, total_nxn_spend: float) -> Dict:
+    """
+    Compute the summary figures for a results frame in one pass.
+
+    Each column is reduced once and the counts come from a single boolean
+    mask, rather than filtering results_df per figure.
+
+    Args:
+        results_df: Processed results with Match Status, Unique Transaction
+            Count, Total Transaction Amount and NXN Spend columns
+        total_nxn_spend: Spend of every line item in the lookup file (see
+            NXNLookupIndex.total_spend)
+
+    Returns:
+        Dictionary of summary metrics (see DataProcessor.get_summary_stats)
+    """
+    matched = (results_df["Match Status"] == MATCHED).to_numpy()
+    matched_count = int(matched.sum())
+
+    total_revenue = results_df["Total Transaction Amount"].sum()
+    # Spend for matched line items only
+    total_spend = results_df["NXN Spend"].sum()
+
+    return {
+        "total_lineitems": len(results_df),
+        "matched_lineitems": matched_count,
+        "unmatched_lineitems": len(results_df) - matched_count,
+        "total_transactions": results_df["Unique Transaction Count"].sum(),
+        "total_revenue": total_revenue,
+        "total_spend": total_spend,
+        "total_nxn_spend": total_nxn_spend,
+        "overall_roas": overall_roas(total_revenue, total_spend),
+    }
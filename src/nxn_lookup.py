@@ -0,0 +1,142 @@
+"""
+Prebuilt index over the NXN line item lookup.
+
+The lookup is normalized once per file: columns are renamed to their report
+names, line_item_id is mapped to the canonical Int64 key and duplicate rows
+per key are collapsed. Enrichment, the unmatched-items anti-join and the
+summary totals all read from the same index, which can be cached and reused
+by every analysis that uses the same lookup file.
+"""
+
+import pandas as pd
+
+from lineitem_keys import normalize_lineitem_ids
+
+# Lookup columns and their report names, in report order
+NXN_COLUMNS = {
+    "line_item_id": "LINEITEMID",
+    "advertiser_name": "Advertiser Name",
+    "insertion_order_id": "Insertion Order ID",
+    "insertion_order_name": "Insertion Order Name",
+    "packag_id": "Package ID",  # Note: might be 'packag_id' or 'package_id'
+    "package_name": "Package Name",
+    "line_item_name": "NXN Line Item Name",
+    "impressions": "NXN Impressions",
+    "advertiser_invoice": "NXN Spend",
+}
+
+# Lookup file columns the report reads (either package id spelling)
+NXN_LOOKUP_COLUMNS = [*NXN_COLUMNS, "package_id"]
+
+# Metrics summed over duplicate rows; other columns keep their first value
+SUMMED_COLUMNS = ["NXN Impressions", "NXN Spend"]
+
+
+class NXNLookupIndex:
+    """NXN lookup rows deduplicated by canonical LINEITEMID key."""
+
+    def __init__(self, rows: pd.DataFrame):
+        """
+        Initialize the index.
+
+        Args:
+            rows: One row per LINEITEMID key (Int64, with at most one <NA>
+                row for lookup rows without a valid line_item_id) followed by
+                the renamed NXN columns
+        """
+        self.rows = rows
+
+        has_key = rows["LINEITEMID"].notna().to_numpy(dtype=bool)
+        self._matchable = rows[has_key].set_index("LINEITEMID")
+
+        # Totals over every line item in the lookup file
+        self.total_spend = (
+            self._matchable["NXN Spend"].sum() if "NXN Spend" in rows.columns else 0
+        )
+        self.total_impressions = (
+            self._matchable["NXN Impressions"].sum()
+            if "NXN Impressions" in rows.columns
+            else 0
+        )
+
+    def __len__(self) -> int:
+        return len(self._matchable)
+
+    @property
+    def columns(self) -> list[str]:
+        """Report names of the NXN columns added by join (without LINEITEMID)."""
+        return self._matchable.columns.tolist()
+
+    @classmethod
+    def from_frame(cls, nxn_lookup_df: pd.DataFrame) -> "NXNLookupIndex":
+        """
+        Build the index from a loaded lookup frame.
+
+        Args:
+            nxn_lookup_df: DataFrame from load_nxn_lookup_file
+
+        Returns:
+            NXNLookupIndex over the lookup rows
+        """
+        # Build list of available columns (handle both 'packag_id' and 'package_id')
+        available_columns = []
+        for col_key, col_name in NXN_COLUMNS.items():
+            if col_key in nxn_lookup_df.columns:
+                available_columns.append((col_key, col_name))
+            elif col_key == "packag_id" and "package_id" in nxn_lookup_df.columns:
+                available_columns.append(("package_id", col_name))
+
+        nxn_subset = nxn_lookup_df[[col[0] for col in available_columns]].copy()
+        nxn_subset.columns = [col[1] for col in available_columns]
+        nxn_subset["LINEITEMID"] = normalize_lineitem_ids(
+            nxn_lookup_df["line_item_id"]
+        ).array
+
+        # Some NXN files have multiple rows per line_item_id (e.g., different
+        # beacon names): sum the metrics and take the first names/IDs
+        agg_dict = {
+            col: "sum" if col in SUMMED_COLUMNS else "first"
+            for col in nxn_subset.columns
+            if col != "LINEITEMID"
+        }
+        rows = nxn_subset.groupby("LINEITEMID", as_index=False, dropna=False).agg(
+            agg_dict
+        )
+
+        return cls(rows)
+
+    def join(self, lineitem_keys: pd.Series) -> pd.DataFrame:
+        """
+        Look up the NXN columns for each line item (a vectorized left join).
+
+        Args:
+            lineitem_keys: Int64 keys from normalize_lineitem_ids
+
+        Returns:
+            DataFrame of NXN columns aligned with lineitem_keys; rows with no
+            match are all missing
+        """
+        joined = self._matchable.reindex(lineitem_keys.array)
+        joined.index = lineitem_keys.index
+        return joined
+
+    def unmatched(self, matched_keys: pd.Series) -> pd.DataFrame:
+        """
+        List the lookup line items that do not appear in matched_keys.
+
+        Args:
+            matched_keys: Int64 keys of the line items found in transactions
+
+        Returns:
+            Deduplicated lookup rows (LINEITEMID as a string) with no match,
+            or an empty DataFrame if every line item matched
+        """
+        unmatched_mask = ~self.rows["LINEITEMID"].isin(matched_keys.dropna())
+        if not unmatched_mask.any():
+            return pd.DataFrame()
+
+        unmatched = self.rows[unmatched_mask.to_numpy(dtype=bool)].reset_index(
+            drop=True
+        )
+        unmatched["LINEITEMID"] = unmatched["LINEITEMID"].astype(str)
+        return unmatched
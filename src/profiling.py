@@ -0,0 +1,132 @@
+"""
+Per-stage profiling for the processing pipeline.
+
+Each stage records its wall time, row counts in and out and memory use.
+Records are kept on the profiler and passed to optional hook callbacks as
+each stage finishes, e.g. to log them or push them to a metrics system.
+"""
+
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+StageHook = Callable[[Dict], None]
+
+# Columns of StageProfiler.to_frame, in display order
+STAGE_COLUMNS = [
+    "stage",
+    "seconds",
+    "rows_in",
+    "rows_out",
+    "peak_traced_bytes",
+    "max_rss_bytes",
+]
+
+
+def max_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far, or None if unknown."""
+    if resource is None:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class StageProfiler:
+    """Records wall time, row counts and memory for named stages."""
+
+    def __init__(
+        self, hooks: Optional[List[StageHook]] = None, trace_memory: bool = False
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            hooks: Callables invoked with each stage record as it finishes
+            trace_memory: Track the peak memory allocated during each stage
+                with tracemalloc. This slows allocation-heavy stages down, so
+                it is off by default; the process-wide peak RSS is always
+                recorded.
+        """
+        self.hooks = list(hooks or [])
+        self.trace_memory = trace_memory
+        self.records = []
+
+    def add_hook(self, hook: StageHook):
+        """Register a callable invoked with each stage record as it finishes."""
+        self.hooks.append(hook)
+
+    def clear(self, stages: Optional[List[str]] = None):
+        """
+        Drop recorded stages.
+
+        Args:
+            stages: Names of the stages to drop (default: all of them)
+        """
+        if stages is None:
+            self.records = []
+        else:
+            self.records = [r for r in self.records if r["stage"] not in stages]
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Profile the enclosed block as one stage.
+
+        The yielded record can be updated inside the block, typically to set
+        rows_out once the stage's output is known.
+
+        Args:
+            name: Stage name
+            rows_in: Number of input rows
+        """
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            record["peak_traced_bytes"] = (
+                tracemalloc.get_traced_memory()[1] if self.trace_memory else None
+            )
+            if started_tracing:
+                tracemalloc.stop()
+            record["max_rss_bytes"] = max_rss_bytes()
+
+        self.records.append(record)
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception as e:
+                print(f"Warning: Stage hook failed for {name}: {str(e)}")
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Convert the recorded stages to a DataFrame.
+
+        Returns:
+            DataFrame with one row per stage and STAGE_COLUMNS columns;
+            measurements that were not taken are NaN
+        """
+        df = pd.DataFrame(self.records, columns=STAGE_COLUMNS)
+        for column in STAGE_COLUMNS[1:]:
+            df[column] = pd.to_numeric(df[column])
+        return df
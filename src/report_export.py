@@ -0,0 +1,115 @@
+"""
+Streaming Excel export of the report tables.
+
+Every table is written as its own sheet, row by row, using xlsxwriter's
+constant_memory mode (or openpyxl's write-only mode when xlsxwriter is not
+installed), so finished rows are flushed instead of kept as cell objects.
+"""
+
+import io
+from typing import Dict, Iterator, Optional
+
+import openpyxl
+import pandas as pd
+
+try:
+    import xlsxwriter
+
+    HAS_XLSXWRITER = True
+except ImportError:  # optional dependency
+    HAS_XLSXWRITER = False
+
+RESULTS_SHEET = "Line Item Performance"
+UNMATCHED_SHEET = "Unmatched NXN Line Items"
+SOURCE_FILES_SHEET = "Revenue by Source File"
+
+# Rows converted to Python values at a time while writing
+ROW_BLOCK_SIZE = 10_000
+
+
+def report_sheets(
+    results_df: pd.DataFrame,
+    unmatched_nxn_df: Optional[pd.DataFrame] = None,
+    revenue_by_file: Optional[pd.DataFrame] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Collect the report tables under their sheet names.
+
+    Args:
+        results_df: Line item results (with Transaction IDs for export)
+        unmatched_nxn_df: NXN line items with no matching transactions
+        revenue_by_file: Total Transaction Amount by Source File Name
+
+    Returns:
+        Ordered mapping of sheet name to table; missing or empty optional
+        tables are left out
+    """
+    sheets = {RESULTS_SHEET: results_df}
+    if unmatched_nxn_df is not None and not unmatched_nxn_df.empty:
+        sheets[UNMATCHED_SHEET] = unmatched_nxn_df
+    if revenue_by_file is not None and not revenue_by_file.empty:
+        sheets[SOURCE_FILES_SHEET] = revenue_by_file
+
+    return sheets
+
+
+def write_report_workbook(output, sheets: Dict[str, pd.DataFrame]):
+    """
+    Write tables to an .xlsx workbook in a single streaming pass.
+
+    Args:
+        output: Path or binary file object to write the workbook to
+        sheets: Mapping of sheet name (at most 31 characters) to table
+    """
+    if HAS_XLSXWRITER:
+        _write_with_xlsxwriter(output, sheets)
+    else:
+        _write_with_openpyxl(output, sheets)
+
+
+def report_workbook_bytes(sheets: Dict[str, pd.DataFrame]) -> bytes:
+    """
+    Build the report workbook in memory, e.g. for a download button.
+
+    Args:
+        sheets: Mapping of sheet name to table (see report_sheets)
+
+    Returns:
+        Content of the .xlsx file
+    """
+    output = io.BytesIO()
+    write_report_workbook(output, sheets)
+    return output.getvalue()
+
+
+def _write_with_xlsxwriter(output, sheets: Dict[str, pd.DataFrame]):
+    # constant_memory flushes each row once the next one starts, so rows
+    # must be written strictly in order
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    try:
+        for sheet_name, df in sheets.items():
+            worksheet = workbook.add_worksheet(sheet_name)
+            for row_number, row in enumerate(_iter_rows(df)):
+                worksheet.write_row(row_number, 0, row)
+    finally:
+        workbook.close()
+
+
+def _write_with_openpyxl(output, sheets: Dict[str, pd.DataFrame]):
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.create_sheet(sheet_name)
+        for row in _iter_rows(df):
+            worksheet.append(row)
+    workbook.save(output)
+
+
+def _iter_rows(df: pd.DataFrame) -> Iterator[list]:
+    """Yield the header and then each row as Python values (None for missing)."""
+    yield [str(column) for column in df.columns]
+
+    for start in range(0, len(df), ROW_BLOCK_SIZE):
+        block = df.iloc[start : start + ROW_BLOCK_SIZE].astype(object)
+        block = block.where(block.notna(), None)
+        for row in block.itertuples(index=False, name=None):
+            yield list(row)
@@ -0,0 +1,308 @@
+"""
+Embedded SQL engine behind the results explorer.
+
+The filterable columns of the results (and, on demand, the line item /
+transaction pairs) are loaded once per analysis into an in-process database:
+DuckDB when installed, otherwise the standard library's SQLite. Filtering,
+sorting and the total row are then single SQL queries instead of copying
+and rescanning the results frame on every Streamlit rerun; search terms are
+looked up in a SearchIndex and joined in. Queries return row positions, so
+the displayed rows come from the original frame with their dtypes
+unchanged.
+"""
+
+import sqlite3
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from attribution import (
+    ATTRIBUTED_REVENUE_COLUMNS,
+    ATTRIBUTED_ROAS_COLUMNS,
+    ATTRIBUTION_MODELS,
+    revenue_column,
+    roas_column,
+)
+from metrics import ROAS_COLUMN
+from search_index import SearchIndex
+
+try:
+    import duckdb
+
+    HAS_DUCKDB = True
+except ImportError:  # optional dependency
+    HAS_DUCKDB = False
+
+QUERY_BACKEND = "duckdb" if HAS_DUCKDB else "sqlite"
+
+# Columns the results can be sorted by
+SORT_COLUMNS = [
+    "Unique Transaction Count",
+    "Total Transaction Amount",
+    "NXN Spend",
+    ROAS_COLUMN,
+    *ATTRIBUTED_REVENUE_COLUMNS,
+    *ATTRIBUTED_ROAS_COLUMNS,
+    "LINEITEMID",
+]
+
+# Columns summed for the total row
+TOTAL_COLUMNS = [
+    "Unique Transaction Count",
+    "Total Transaction Amount",
+    "NXN Impressions",
+    "NXN Spend",
+    *ATTRIBUTED_REVENUE_COLUMNS,
+]
+
+FILTER_COLUMN = "Insertion Order Name"
+
+# Sort option ordering search matches best first (see SearchIndex.search)
+RELEVANCE = "Search Relevance"
+
+_POSITION = "row_position"
+
+
+def _quote(column: str) -> str:
+    """Quote a column name for SQL."""
+    return '"' + column.replace('"', '""') + '"'
+
+
+class ResultsQuery:
+    """Filter, search, sort and total queries over one set of results."""
+
+    def __init__(
+        self,
+        results_df: pd.DataFrame,
+        pairs_source: Optional[Callable[[], pd.DataFrame]] = None,
+        backend: Optional[str] = None,
+    ):
+        """
+        Load the results into the engine.
+
+        Args:
+            results_df: Line item results (see DataProcessor.process_transactions)
+            pairs_source: Callable returning the LINEITEMID / Transaction ID
+                pairs (e.g. DataProcessor.get_lineitem_pairs); called the
+                first time a pairs query runs
+            backend: "duckdb" or "sqlite" (default: QUERY_BACKEND)
+        """
+        self.backend = backend or QUERY_BACKEND
+        if self.backend == "duckdb" and not HAS_DUCKDB:
+            raise ValueError("The duckdb backend requires duckdb to be installed")
+        if self.backend not in ("duckdb", "sqlite"):
+            raise ValueError(f"Unknown query backend '{self.backend}'")
+
+        self.columns = set(results_df.columns)
+        self._results_df = results_df
+        self._search_index = None
+        self._search_term = None
+        self._pairs_source = pairs_source
+        self._pairs_loaded = False
+
+        if self.backend == "duckdb":
+            self._connection = duckdb.connect()
+        else:
+            # Streamlit reruns the script on different threads
+            self._connection = sqlite3.connect(":memory:", check_same_thread=False)
+
+        self._load("results", self._query_frame(results_df))
+
+    def _query_frame(self, results_df: pd.DataFrame) -> pd.DataFrame:
+        """Select the columns queries need."""
+        frame = pd.DataFrame({_POSITION: np.arange(len(results_df))})
+        wanted = [FILTER_COLUMN, *SORT_COLUMNS, *TOTAL_COLUMNS]
+        for column in dict.fromkeys(wanted):
+            if column in results_df.columns:
+                frame[column] = results_df[column].to_numpy()
+
+        return frame
+
+    def _load(self, table: str, frame: pd.DataFrame):
+        """Create `table` from a DataFrame."""
+        # Nullable dtypes, so missing values (including NaN) load as NULL
+        frame = frame.convert_dtypes()
+        if self.backend == "duckdb":
+            self._connection.register(f"{table}_frame", frame)
+            self._connection.execute(
+                f"CREATE TABLE {table} AS SELECT * FROM {table}_frame"
+            )
+            self._connection.unregister(f"{table}_frame")
+        else:
+            frame.to_sql(table, self._connection, index=False)
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> list:
+        """Run a query and fetch every row."""
+        return self._connection.execute(sql, list(parameters)).fetchall()
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Search index over the results, built on first use."""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self._results_df)
+        return self._search_index
+
+    def _load_search_hits(self, search: str):
+        """Store the matches of `search` in the search_hits table."""
+        if search == self._search_term:
+            return
+
+        positions, scores = self.search_index.search(search)
+        self._execute("DROP TABLE IF EXISTS search_hits")
+        self._execute(
+            "CREATE TEMP TABLE search_hits (hit_position BIGINT, score BIGINT)"
+        )
+        self._connection.executemany(
+            "INSERT INTO search_hits VALUES (?, ?)",
+            zip(positions.tolist(), scores.tolist()),
+        )
+        self._search_term = search
+
+    def _filter(
+        self, insertion_orders: Optional[List[str]], search: Optional[str]
+    ) -> str:
+        """Build the FROM and WHERE clauses for a filter."""
+        source = "results"
+        if search:
+            self._load_search_hits(search)
+            source += (
+                f" JOIN search_hits ON search_hits.hit_position = {_quote(_POSITION)}"
+            )
+
+        if insertion_orders and FILTER_COLUMN in self.columns:
+            self._execute("DROP TABLE IF EXISTS selected_filter")
+            self._execute("CREATE TEMP TABLE selected_filter (value VARCHAR)")
+            self._connection.executemany(
+                "INSERT INTO selected_filter VALUES (?)",
+                [(str(value),) for value in insertion_orders],
+            )
+            source += (
+                f" WHERE CAST({_quote(FILTER_COLUMN)} AS VARCHAR) IN "
+                "(SELECT value FROM selected_filter)"
+            )
+
+        return source
+
+    def insertion_orders(self) -> List:
+        """Sorted distinct non-missing Insertion Order Name values."""
+        if FILTER_COLUMN not in self.columns:
+            return []
+
+        column = _quote(FILTER_COLUMN)
+        rows = self._execute(
+            f"SELECT DISTINCT {column} FROM results WHERE {column} IS NOT NULL"
+        )
+        return sorted(row[0] for row in rows)
+
+    def positions(
+        self,
+        insertion_orders: Optional[List[str]] = None,
+        search: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        ascending: bool = False,
+    ) -> np.ndarray:
+        """
+        Find the result rows matching a filter, in display order.
+
+        Args:
+            insertion_orders: Keep rows with one of these Insertion Order
+                Names (None or empty keeps every row)
+            search: Keep rows where a SearchIndex column (LINEITEMID, line
+                item, Insertion Order or Advertiser Name) contains this text,
+                ignoring case
+            sort_by: Column to sort by (one of SORT_COLUMNS) or RELEVANCE;
+                missing values go last and ties keep their original order
+            ascending: Sort direction (RELEVANCE always lists the best
+                matches first)
+
+        Returns:
+            Row positions into the results frame
+        """
+        source = self._filter(insertion_orders, search)
+
+        order = _quote(_POSITION)
+        if sort_by == RELEVANCE:
+            if search:
+                order = f"search_hits.score DESC, {order}"
+        elif sort_by in self.columns and sort_by in SORT_COLUMNS:
+            direction = "ASC" if ascending else "DESC"
+            order = f"{_quote(sort_by)} {direction} NULLS LAST, {order}"
+
+        rows = self._execute(
+            f"SELECT {_quote(_POSITION)} FROM {source} ORDER BY {order}"
+        )
+        return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+    def totals(
+        self,
+        insertion_orders: Optional[List[str]] = None,
+        search: Optional[str] = None,
+    ) -> Dict:
+        """
+        Sum the total columns over the rows matching a filter.
+
+        Args:
+            insertion_orders: As in positions
+            search: As in positions
+
+        Returns:
+            Dict with the row count under "rows", each TOTAL_COLUMNS column
+            present in the results, and the ROAS columns (revenue over spend,
+            per attribution model as well) when spend is positive
+        """
+        source = self._filter(insertion_orders, search)
+        columns = [column for column in TOTAL_COLUMNS if column in self.columns]
+        sums = "".join(f", COALESCE(SUM({_quote(column)}), 0)" for column in columns)
+
+        row = self._execute(f"SELECT COUNT(*){sums} FROM {source}")[0]
+        totals = {"rows": int(row[0])}
+        totals.update(zip(columns, row[1:]))
+
+        if "Total Transaction Amount" in totals and "NXN Spend" in totals:
+            if totals["NXN Spend"] > 0:
+                totals[ROAS_COLUMN] = (
+                    totals["Total Transaction Amount"] / totals["NXN Spend"]
+                )
+                for model in ATTRIBUTION_MODELS:
+                    if revenue_column(model) in totals:
+                        totals[roas_column(model)] = (
+                            totals[revenue_column(model)] / totals["NXN Spend"]
+                        )
+
+        return totals
+
+    def lineitems_for_transaction(self, transaction_id: str) -> List[str]:
+        """
+        List the LINEITEMIDs a transaction was attributed to.
+
+        Args:
+            transaction_id: Transaction ID (compared as a string)
+
+        Returns:
+            Sorted LINEITEMIDs (empty if the transaction is unknown or no
+            pairs source was given)
+        """
+        if self._pairs_source is None:
+            return []
+
+        if not self._pairs_loaded:
+            pairs_df = self._pairs_source()
+            self._load(
+                "pairs",
+                pd.DataFrame(
+                    {
+                        "LINEITEMID": pairs_df["LINEITEMID"].astype(str).to_numpy(),
+                        "transaction_id": pairs_df["Transaction ID"]
+                        .astype(str)
+                        .to_numpy(),
+                    }
+                ),
+            )
+            self._pairs_loaded = True
+
+        rows = self._execute(
+            "SELECT LINEITEMID FROM pairs WHERE transaction_id = ? ORDER BY LINEITEMID",
+            [str(transaction_id)],
+        )
+        return [row[0] for row in rows]
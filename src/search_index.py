@@ -0,0 +1,205 @@
+"""
+Substring search index over the text columns of the results.
+
+Built once per result set. Values are lower-cased and deduplicated across
+the searched columns (Insertion Order and Advertiser Names repeat on many
+rows), then every distinct value is indexed by its character trigrams.
+A query intersects the posting lists of its trigrams, starting from the
+shortest, and verifies the few remaining candidates, so the work follows
+the number of candidate values rather than the number of rows. Matching
+rows are ranked by how well and in which column they matched.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Searched columns with their ranking weight (higher ranks first)
+SEARCH_COLUMNS = {
+    "LINEITEMID": 4,
+    "NXN Line Item Name": 3,
+    "Insertion Order Name": 2,
+    "Advertiser Name": 1,
+}
+
+NGRAM = 3
+
+# Match kinds, best first; a row's score is kind * 10 + column weight
+EXACT_MATCH = 3
+PREFIX_MATCH = 2
+SUBSTRING_MATCH = 1
+
+
+def _csr(keys: np.ndarray, values: np.ndarray, size: int) -> tuple:
+    """Group `values` by integer `keys` into (offsets, values sorted by key)."""
+    order = np.argsort(keys, kind="stable")
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=offsets[1:])
+    return offsets, values[order]
+
+
+def _gather(offsets: np.ndarray, values: np.ndarray, keys: np.ndarray) -> tuple:
+    """
+    Collect the CSR groups of `keys`.
+
+    Returns:
+        Tuple of (concatenated values, position in `keys` of each value)
+    """
+    starts = offsets[keys]
+    lengths = offsets[keys + 1] - starts
+    owners = np.repeat(np.arange(len(keys)), lengths)
+    group_starts = np.cumsum(lengths) - lengths
+    return values[
+        starts[owners] + np.arange(len(owners)) - group_starts[owners]
+    ], owners
+
+
+class SearchIndex:
+    """Trigram index answering case-insensitive substring queries."""
+
+    def __init__(
+        self, results_df: pd.DataFrame, columns: Optional[Dict[str, int]] = None
+    ):
+        """
+        Build the index.
+
+        Args:
+            results_df: Results to search
+            columns: Columns to search with their ranking weights (default:
+                SEARCH_COLUMNS); columns missing from results_df are skipped
+        """
+        columns = SEARCH_COLUMNS if columns is None else columns
+        self.columns = {
+            column: weight
+            for column, weight in columns.items()
+            if column in results_df.columns
+        }
+        self.rows = len(results_df)
+
+        # Distinct lower-cased values over every searched column
+        lowered = {
+            column: results_df[column].astype("string").str.lower().to_numpy()
+            for column in self.columns
+        }
+        all_values = (
+            np.concatenate(list(lowered.values()))
+            if lowered
+            else np.array([], dtype=object)
+        )
+        codes, vocabulary = pd.factorize(all_values, use_na_sentinel=True)
+        self._vocabulary = np.asarray(vocabulary, dtype=object)
+
+        # Rows holding each value, per column: value id -> row positions
+        self._rows_by_value = {}
+        for number, column in enumerate(self.columns):
+            column_codes = codes[number * self.rows : (number + 1) * self.rows]
+            present = column_codes >= 0
+            self._rows_by_value[column] = _csr(
+                column_codes[present],
+                np.flatnonzero(present),
+                len(self._vocabulary),
+            )
+
+        self._build_ngrams()
+
+    def _build_ngrams(self):
+        """Index every distinct value by its distinct trigrams."""
+        grams, owners = [], []
+        for value_id, value in enumerate(self._vocabulary):
+            value_grams = {value[i : i + NGRAM] for i in range(len(value) - NGRAM + 1)}
+            grams.extend(value_grams)
+            owners.extend([value_id] * len(value_grams))
+
+        gram_codes, gram_values = pd.factorize(np.asarray(grams, dtype=object))
+        self._gram_lookup = pd.Index(gram_values)
+        self._postings = _csr(
+            gram_codes, np.asarray(owners, dtype=np.int64), len(gram_values)
+        )
+
+    def __len__(self) -> int:
+        """Number of distinct values indexed."""
+        return len(self._vocabulary)
+
+    def _candidate_values(self, query: str) -> np.ndarray:
+        """Ids of values that may contain the query (all values if too short)."""
+        if len(query) < NGRAM:
+            return np.arange(len(self._vocabulary))
+
+        query_grams = list(
+            {query[i : i + NGRAM] for i in range(len(query) - NGRAM + 1)}
+        )
+        gram_codes = self._gram_lookup.get_indexer(query_grams)
+        if (gram_codes < 0).any():
+            return np.array([], dtype=np.int64)
+
+        offsets, owners = self._postings
+        postings = sorted(
+            (owners[offsets[code] : offsets[code + 1]] for code in gram_codes),
+            key=len,
+        )
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+
+        return candidates
+
+    def search(self, query: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find rows with a searched column containing `query`, ignoring case.
+
+        Args:
+            query: Text to look for (matched literally)
+
+        Returns:
+            Tuple of (row positions, scores), best match first and in row
+            order among equal scores. Scores rank an exact match over a
+            prefix match over any other substring match, then by column
+            weight.
+        """
+        query = query.lower()
+        if not query:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+        value_ids = np.array(
+            [
+                value_id
+                for value_id in self._candidate_values(query)
+                if query in self._vocabulary[value_id]
+            ],
+            dtype=np.int64,
+        )
+        if len(value_ids) == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+        kinds = np.array(
+            [
+                EXACT_MATCH
+                if value == query
+                else PREFIX_MATCH
+                if value.startswith(query)
+                else SUBSTRING_MATCH
+                for value in self._vocabulary[value_ids]
+            ],
+            dtype=np.int64,
+        )
+
+        matched_rows, matched_scores = [], []
+        for column, weight in self.columns.items():
+            rows, owners = _gather(*self._rows_by_value[column], value_ids)
+            matched_rows.append(rows)
+            matched_scores.append(kinds[owners] * 10 + weight)
+
+        # Best score of each row, then rank rows by score and position
+        rows = np.concatenate(matched_rows)
+        scores = np.concatenate(matched_scores)
+        order = np.lexsort((-scores, rows))
+        rows, scores = rows[order], scores[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = rows[1:] != rows[:-1]
+        rows, scores = rows[first], scores[first]
+
+        ranked = np.lexsort((rows, -scores))
+        return rows[ranked], scores[ranked]
@@ -0,0 +1,245 @@
+"""
+Streaming first-occurrence deduplication of Transaction IDs.
+
+Transaction files are often overlapping exports, so the same transaction can
+appear in several of them. Rows are checked chunk by chunk against every ID
+seen so far; only 64-bit hashes of the IDs and the Transaction Total of
+their first occurrence are kept, not the rows themselves. Duplicates whose
+total differs from the kept row are counted as conflicts, since dropping
+them changes revenue.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Sorted hash chunks are merged once this many have accumulated
+MAX_HASH_CHUNKS = 16
+
+# Number of conflicting duplicates listed in the summary
+MAX_CONFLICT_EXAMPLES = 20
+
+# Missing Transaction IDs all share one key, as they do in drop_duplicates
+_MISSING_ID = "\x00missing"
+
+# Floats up to this magnitude are converted to int exactly
+_MAX_EXACT_INT = 2**63
+
+
+def hash_transaction_ids(transaction_ids: pd.Series) -> np.ndarray:
+    """
+    Hash Transaction IDs to uint64.
+
+    IDs are hashed by their string form, so 123 read from Excel and "123"
+    read from a text column are the same transaction (as in TransactionIndex).
+    Whole-number floats are hashed as integers first: a numeric ID column
+    with blanks is read as float, and its 100.0 is the same transaction as
+    100 from a column without blanks, as drop_duplicates on the combined
+    files treats it. Two different IDs share a hash with probability about
+    n^2 / 2^65 for n distinct IDs, i.e. effectively never for transaction
+    exports.
+
+    Args:
+        transaction_ids: Transaction ID column
+
+    Returns:
+        Array of uint64 hashes, one per row
+    """
+    values = transaction_ids.astype(object).to_numpy(dtype=object, copy=True)
+    missing = transaction_ids.isna().to_numpy()
+
+    is_float = np.fromiter(
+        (isinstance(value, float) for value in values), dtype=bool, count=len(values)
+    )
+    if is_float.any():
+        numbers = np.where(is_float & ~missing, values, np.nan).astype(np.float64)
+        whole = (numbers == np.floor(numbers)) & (np.abs(numbers) < _MAX_EXACT_INT)
+        values[whole] = [int(number) for number in numbers[whole]]
+
+    values[missing] = _MISSING_ID
+    return pd.util.hash_array(values, categorize=False)
+
+
+class TransactionDeduplicator:
+    """First-occurrence Transaction ID filter with duplicate and conflict counts."""
+
+    def __init__(self):
+        """Initialize with no Transaction IDs seen."""
+        # Sorted hashes of the IDs kept so far, with the Transaction Total of
+        # each kept row at the same position
+        self._hash_chunks = []
+        self._total_chunks = []
+
+        self.rows = 0
+        self.duplicates = 0
+        self.conflicts = 0
+        self.conflict_examples = []
+
+    def __len__(self) -> int:
+        """Number of distinct Transaction IDs seen."""
+        return sum(len(chunk) for chunk in self._hash_chunks)
+
+    def first_occurrence_mask(
+        self,
+        transaction_ids: pd.Series,
+        totals: Optional[pd.Series] = None,
+        source: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Mark rows whose Transaction ID has not been seen, recording them as seen.
+
+        Args:
+            transaction_ids: Transaction ID column of the chunk
+            totals: Transaction Total column of the chunk; duplicates with a
+                different total than the kept row are counted as conflicts
+            source: Name of the chunk's source (e.g. the file name), listed
+                with conflict examples
+
+        Returns:
+            Boolean array, True for rows to keep
+        """
+        hashes = hash_transaction_ids(transaction_ids)
+        if totals is None:
+            totals = np.full(len(hashes), np.nan)
+        else:
+            totals = pd.to_numeric(totals, errors="coerce").to_numpy(dtype=np.float64)
+
+        # First occurrence within the chunk; factorize codes follow the order
+        # of first appearance, so first_positions[code] is that row
+        codes, _ = pd.factorize(hashes)
+        _, first_positions = np.unique(codes, return_index=True)
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[first_positions] = True
+        reference_totals = totals[first_positions[codes]]
+
+        # Rows whose ID was kept by an earlier chunk
+        for hash_chunk, total_chunk in zip(self._hash_chunks, self._total_chunks):
+            positions = np.searchsorted(hash_chunk, hashes)
+            positions[positions == len(hash_chunk)] = 0
+            found = hash_chunk[positions] == hashes
+            keep &= ~found
+            reference_totals[found] = total_chunk[positions[found]]
+
+        duplicates = ~keep
+        conflicts = duplicates & ~(
+            (totals == reference_totals)
+            | (np.isnan(totals) & np.isnan(reference_totals))
+        )
+
+        self.rows += len(hashes)
+        self.duplicates += int(duplicates.sum())
+        self.conflicts += int(conflicts.sum())
+        self._record_conflicts(
+            transaction_ids, totals, reference_totals, conflicts, source
+        )
+        self._add(hashes[keep], totals[keep])
+
+        return keep
+
+    def _record_conflicts(
+        self,
+        transaction_ids: pd.Series,
+        totals: np.ndarray,
+        reference_totals: np.ndarray,
+        conflicts: np.ndarray,
+        source: Optional[str],
+    ):
+        """Keep the first MAX_CONFLICT_EXAMPLES conflicting rows for the summary."""
+        room = MAX_CONFLICT_EXAMPLES - len(self.conflict_examples)
+        if room <= 0:
+            return
+
+        for position in np.flatnonzero(conflicts)[:room]:
+            self.conflict_examples.append(
+                {
+                    "Transaction ID": transaction_ids.iloc[position],
+                    "Kept Total": reference_totals[position],
+                    "Dropped Total": totals[position],
+                    "Source": source,
+                }
+            )
+
+    def _add(self, hashes: np.ndarray, totals: np.ndarray):
+        """Store newly kept hashes, merging the sorted chunks now and then."""
+        if len(hashes) == 0:
+            return
+
+        order = np.argsort(hashes, kind="stable")
+        self._hash_chunks.append(hashes[order])
+        self._total_chunks.append(totals[order])
+
+        if len(self._hash_chunks) >= MAX_HASH_CHUNKS:
+            hashes = np.concatenate(self._hash_chunks)
+            order = np.argsort(hashes, kind="stable")
+            self._hash_chunks = [hashes[order]]
+            self._total_chunks = [np.concatenate(self._total_chunks)[order]]
+
+    def merge(self, other: "TransactionDeduplicator") -> "TransactionDeduplicator":
+        """
+        Fold in the IDs and counts of a deduplicator over later rows.
+
+        IDs already seen here keep their total; the other's duplicate and
+        conflict counts are added as they are.
+
+        Args:
+            other: Deduplicator over rows that come after this one's
+
+        Returns:
+            This deduplicator, updated in place
+        """
+        for hash_chunk, total_chunk in zip(other._hash_chunks, other._total_chunks):
+            new = np.ones(len(hash_chunk), dtype=bool)
+            for seen_chunk in self._hash_chunks:
+                positions = np.searchsorted(seen_chunk, hash_chunk)
+                positions[positions == len(seen_chunk)] = 0
+                new &= seen_chunk[positions] != hash_chunk
+            self._add(hash_chunk[new], total_chunk[new])
+
+        self.rows += other.rows
+        self.duplicates += other.duplicates
+        self.conflicts += other.conflicts
+        self.conflict_examples = (self.conflict_examples + other.conflict_examples)[
+            :MAX_CONFLICT_EXAMPLES
+        ]
+        return self
+
+    def summary(self) -> Dict:
+        """
+        Summarize the rows checked so far.
+
+        Returns:
+            Dict with rows, unique_transactions, duplicates, conflicts
+            (duplicates whose Transaction Total differs from the kept row)
+            and conflict_examples (list of dicts with Transaction ID, Kept
+            Total, Dropped Total and Source)
+        """
+        return {
+            "rows": self.rows,
+            "unique_transactions": len(self),
+            "duplicates": self.duplicates,
+            "conflicts": self.conflicts,
+            "conflict_examples": list(self.conflict_examples),
+        }
+
+    def conflict_frame(self) -> pd.DataFrame:
+        """
+        List the recorded conflicting duplicates.
+
+        Returns:
+            DataFrame with Transaction ID, Kept Total, Dropped Total and
+            Source (at most MAX_CONFLICT_EXAMPLES rows)
+        """
+        return pd.DataFrame(
+            self.conflict_examples,
+            columns=["Transaction ID", "Kept Total", "Dropped Total", "Source"],
+        )
+
+
+def conflict_examples_text(examples: List[Dict], limit: int = 5) -> str:
+    """Format conflict examples as 'ID (kept X, dropped Y)' for warnings."""
+    return ", ".join(
+        f"{example['Transaction ID']} (kept {example['Kept Total']}, "
+        f"dropped {example['Dropped Total']})"
+        for example in examples[:limit]
+    )
@@ -0,0 +1,219 @@
+"""
+Compact LINEITEMID to Transaction ID membership index.
+
+Transaction IDs are integer coded (codes follow the sorted order of the ID
+strings) and each line item's distinct transactions are stored as a slice of
+one codes array, CSR style. Comma-separated ID strings are only built for the
+rows being displayed or exported.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def unique_sorted(values: np.ndarray) -> np.ndarray:
+    """
+    Sorted distinct values of an integer array.
+
+    Equivalent to np.unique, but sort-based: recent numpy versions use a much
+    slower hash-based path for large integer arrays.
+    """
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+class TransactionIndex:
+    """CSR index of the distinct Transaction IDs each line item appears in."""
+
+    def __init__(
+        self,
+        lineitem_ids,
+        transaction_ids: np.ndarray,
+        offsets: np.ndarray,
+        codes: np.ndarray,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            lineitem_ids: LINEITEMID of each index row
+            transaction_ids: Sorted array of distinct Transaction ID strings;
+                a transaction's code is its position in this array
+            offsets: Array of len(lineitem_ids) + 1 positions into codes
+            codes: Transaction codes, ascending within each line item's slice
+        """
+        self.lineitem_ids = np.asarray(lineitem_ids, dtype=object)
+        self.transaction_ids = transaction_ids
+        self.offsets = offsets
+        self.codes = codes
+        self._positions = {str(lid): i for i, lid in enumerate(self.lineitem_ids)}
+        self._inverse = None
+
+    def __len__(self) -> int:
+        return len(self.lineitem_ids)
+
+    @classmethod
+    def empty(cls) -> "TransactionIndex":
+        """Build an index with no line items."""
+        return cls(
+            [],
+            np.array([], dtype=object),
+            np.zeros(1, dtype=np.int64),
+            np.array([], dtype=np.int32),
+        )
+
+    @classmethod
+    def from_pairs(cls, lineitem_ids, transaction_ids) -> "TransactionIndex":
+        """
+        Build the index from parallel arrays of transaction-lineitem pairs.
+
+        Args:
+            lineitem_ids: LINEITEMID of each pair
+            transaction_ids: Transaction ID string of each pair
+
+        Returns:
+            TransactionIndex with line items in sorted order
+        """
+        lineitem_codes, lineitem_values = pd.factorize(
+            np.asarray(lineitem_ids, dtype=object), sort=True
+        )
+        transaction_codes, transaction_values = pd.factorize(
+            np.asarray(transaction_ids, dtype=object), sort=True
+        )
+
+        # Pairs with a missing LINEITEMID are dropped, as groupby does
+        valid = lineitem_codes >= 0
+        return cls.from_codes(
+            lineitem_values,
+            lineitem_codes[valid],
+            np.asarray(transaction_values, dtype=object),
+            transaction_codes[valid],
+        )
+
+    @classmethod
+    def from_codes(
+        cls,
+        lineitem_ids,
+        lineitem_codes: np.ndarray,
+        transaction_ids: np.ndarray,
+        transaction_codes: np.ndarray,
+    ) -> "TransactionIndex":
+        """
+        Build the index from integer-coded pairs.
+
+        Args:
+            lineitem_ids: LINEITEMID for each line item code
+            lineitem_codes: Line item code of each pair
+            transaction_ids: Sorted Transaction ID strings for each code
+            transaction_codes: Transaction code of each pair (duplicates allowed)
+
+        Returns:
+            TransactionIndex over the distinct pairs
+        """
+        transaction_count = max(len(transaction_ids), 1)
+        keys = unique_sorted(
+            lineitem_codes.astype(np.int64) * transaction_count
+            + transaction_codes.astype(np.int64)
+        )
+
+        offsets = np.zeros(len(lineitem_ids) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(keys // transaction_count, minlength=len(lineitem_ids)),
+            out=offsets[1:],
+        )
+        codes = (keys % transaction_count).astype(np.int32)
+
+        return cls(lineitem_ids, transaction_ids, offsets, codes)
+
+    def transactions_for(self, lineitem_id) -> list[str]:
+        """
+        List the distinct Transaction IDs a line item appears in.
+
+        Args:
+            lineitem_id: LINEITEMID as shown in results_df
+
+        Returns:
+            Sorted list of Transaction ID strings (empty if unknown)
+        """
+        position = self._positions.get(str(lineitem_id))
+        if position is None:
+            return []
+
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return self.transaction_ids[self.codes[start:end]].tolist()
+
+    def lineitems_for(self, transaction_id) -> list:
+        """
+        List the line items whose journeys include a transaction.
+
+        Args:
+            transaction_id: Transaction ID (compared as a string)
+
+        Returns:
+            List of LINEITEMID values (empty if unknown)
+        """
+        transaction_id = str(transaction_id)
+        code = np.searchsorted(self.transaction_ids, transaction_id)
+        if (
+            code >= len(self.transaction_ids)
+            or self.transaction_ids[code] != transaction_id
+        ):
+            return []
+
+        inverse_offsets, inverse_rows = self._inverse_index()
+        start, end = inverse_offsets[code], inverse_offsets[code + 1]
+        return self.lineitem_ids[inverse_rows[start:end]].tolist()
+
+    def join(self, lineitem_ids) -> pd.Series:
+        """
+        Build comma-separated Transaction ID strings for the given line items.
+
+        Args:
+            lineitem_ids: Series or list of LINEITEMID values, e.g. the
+                LINEITEMID column of a filtered results page
+
+        Returns:
+            Series of strings aligned with lineitem_ids
+        """
+        index = lineitem_ids.index if isinstance(lineitem_ids, pd.Series) else None
+        strings = [", ".join(self.transactions_for(lid)) for lid in lineitem_ids]
+        return pd.Series(strings, index=index, dtype=object)
+
+    def to_pairs(self) -> pd.DataFrame:
+        """
+        Expand the index into one row per (LINEITEMID, Transaction ID) pair.
+
+        Returns:
+            DataFrame with LINEITEMID and Transaction ID columns, ordered by
+            index row then Transaction ID
+        """
+        rows = np.repeat(np.arange(len(self.lineitem_ids)), np.diff(self.offsets))
+        return pd.DataFrame(
+            {
+                "LINEITEMID": self.lineitem_ids[rows],
+                "Transaction ID": self.transaction_ids[self.codes],
+            }
+        )
+
+    def _inverse_index(self) -> tuple[np.ndarray, np.ndarray]:
+        """Lazily build the transaction-to-line-item CSR arrays."""
+        if self._inverse is None:
+            rows = np.repeat(
+                np.arange(len(self.lineitem_ids), dtype=np.int32),
+                np.diff(self.offsets),
+            )
+            order = np.argsort(self.codes, kind="stable")
+            inverse_offsets = np.zeros(len(self.transaction_ids) + 1, dtype=np.int64)
+            np.cumsum(
+                np.bincount(self.codes, minlength=len(self.transaction_ids)),
+                out=inverse_offsets[1:],
+            )
+            self._inverse = (inverse_offsets, rows[order])
+
+        return self._inverse
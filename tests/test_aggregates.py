@@ -0,0 +1,68 @@
+"""Regression checks for the mergeable LineItemAggregate path."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from aggregates import LineItemAggregate
+from data_processor import DataProcessor
+
+# Journeys mixing numeric and string LINEITEMIDs
+MIXED_JOURNEYS = [
+    [5, "abc", 12, "9x"],
+    ["abc", 5],
+    [13, "9x", 13],
+    ["abc"],
+    [12, 5, 14],
+]
+
+
+@pytest.fixture
+def mixed_data():
+    data_df = pd.DataFrame(
+        {
+            "Transaction ID": [f"T{i}" for i in range(len(MIXED_JOURNEYS) * 4)],
+            "Transaction Total": [10.0 + i for i in range(len(MIXED_JOURNEYS) * 4)],
+            "Impressions": [
+                json.dumps([{"LINEITEMID": lid} for lid in journey])
+                for journey in MIXED_JOURNEYS * 4
+            ],
+        }
+    )
+    nxn_lookup_df = pd.DataFrame(
+        {
+            "line_item_id": pd.array([5, 12], dtype="Int64"),
+            "line_item_name": ["Five", "Twelve"],
+            "impressions": [100, 200],
+            "advertiser_invoice": [10.0, 20.0],
+        }
+    )
+    return data_df, nxn_lookup_df
+
+
+def test_mixed_lineitem_ids_match_serial_engine(mixed_data):
+    data_df, nxn_lookup_df = mixed_data
+    expected = DataProcessor(data_df.copy(), nxn_lookup_df).process_transactions()
+
+    processor = DataProcessor(None, nxn_lookup_df, aggregate=LineItemAggregate())
+    processor.add_transactions(data_df.iloc[:7].copy())
+    processor.add_transactions(data_df.iloc[7:].copy())
+    result = processor.process_transactions()
+
+    pd.testing.assert_frame_equal(
+        result.reset_index(drop=True), expected.reset_index(drop=True)
+    )
+
+
+def test_mixed_lineitem_ids_with_workers(mixed_data):
+    data_df, nxn_lookup_df = mixed_data
+    expected = DataProcessor(data_df.copy(), nxn_lookup_df).process_transactions()
+
+    result = DataProcessor(
+        data_df.copy(), nxn_lookup_df, workers=2
+    ).process_transactions()
+
+    pd.testing.assert_frame_equal(
+        result.reset_index(drop=True), expected.reset_index(drop=True)
+    )
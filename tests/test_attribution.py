@@ -0,0 +1,60 @@
+"""Regression checks for the attribution touch weights."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from attribution import revenue_column, touch_weights
+from data_processor import DataProcessor
+
+
+def test_repeated_lineitem_takes_last_touch():
+    # Journey [1, 2, 1]: line item 1 made the first and the last impression
+    weights = touch_weights(np.array([0, 1]), np.array([2, 1]))
+
+    np.testing.assert_allclose(weights["first_touch"], [1.0, 0.0])
+    np.testing.assert_allclose(weights["last_touch"], [1.0, 0.0])
+    np.testing.assert_allclose(weights["position_based"], [0.8, 0.2])
+    np.testing.assert_allclose(weights["even"], [0.5, 0.5])
+
+
+def test_distinct_journeys_keep_position_based_split():
+    # Journeys [a], [a, b] and [a, b, c, d]
+    positions = np.array([0, 0, 1, 0, 1, 2, 3])
+    weights = touch_weights(positions, positions)
+
+    np.testing.assert_allclose(
+        weights["position_based"], [1.0, 0.5, 0.5, 0.4, 0.1, 0.1, 0.4]
+    )
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"engine": "rows"}, {"impression_fields": ["TIMESTAMP"]}, {"workers": 2}],
+)
+def test_engines_credit_last_impression(options):
+    data_df = pd.DataFrame(
+        {
+            "Transaction ID": ["T1", "T2"],
+            "Transaction Total": [100.0, 50.0],
+            "Impressions": [
+                json.dumps([{"LINEITEMID": lid} for lid in [1, 2, 1]]),
+                json.dumps([{"LINEITEMID": lid} for lid in [3, 3, 4]]),
+            ],
+        }
+    )
+    nxn_lookup_df = pd.DataFrame(
+        {
+            "line_item_id": pd.array([1], dtype="Int64"),
+            "line_item_name": ["One"],
+            "impressions": [100],
+            "advertiser_invoice": [10.0],
+        }
+    )
+
+    results = DataProcessor(data_df, nxn_lookup_df, **options).process_transactions()
+    last_touch = dict(zip(results["LINEITEMID"], results[revenue_column("last_touch")]))
+
+    assert last_touch == {"1": 100.0, "2": 0.0, "3": 0.0, "4": 50.0}